@@ -0,0 +1,217 @@
+"""
+Asyncio engine for wMouseClicker.
+Each ClickJob runs as its own coroutine on one event loop: it sleeps until its
+absolute deadline, hands the blocking capture/compare to an executor, then
+clicks (also off the loop, one click at a time). Stopping cancels every task
+at once. Many targets share a handful of OS threads: the loop thread plus the
+executor's workers.
+
+For tests, VirtualTimeLoop skips idle time and InlineExecutor runs the
+offloaded work synchronously, so a whole schedule runs deterministically in
+a fraction of its real time (see benchmarks/bench_async.py).
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import random
+import selectors
+import time
+import weakref
+
+from metrics import NULL_METRICS
+from scheduler import check_tick, click_job, finish_tick
+
+DEFAULT_WORKERS = 4
+
+
+class InlineExecutor(concurrent.futures.Executor):
+    """Executor that runs each call immediately on the submitting thread"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Polls real file descriptors but never blocks: idle time is skipped instead"""
+
+    def __init__(self, loop_ref):
+        super().__init__()
+        self._loop_ref = loop_ref
+
+    def select(self, timeout=None):
+        ready = super().select(0 if timeout is not None else None)
+        if not ready and timeout:
+            self._loop_ref().now += timeout
+        return ready
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps straight to the next timer when idle
+
+    asyncio.sleep, wait_for and loop.call_later all run on virtual time, so an
+    hour of schedule runs in milliseconds. Pair it with InlineExecutor: work
+    running on real threads does not hold virtual time back.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+        super().__init__(_VirtualSelector(weakref.ref(self)))
+
+    def time(self):
+        return self.now
+
+
+def run_virtual(coro, start=0.0):
+    """asyncio.run() on a VirtualTimeLoop"""
+    loop = VirtualTimeLoop(start)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class AsyncEngine:
+    """Runs many ClickJobs as coroutines on one event loop"""
+
+    def __init__(self, backend, clicker=None, executor=None, rng=None, on_tick=None,
+                 metrics=NULL_METRICS, on_outcome=None, recorder=None):
+        self.backend = backend
+        # Called as clicker(job) in the executor; None plays click_job on `backend`
+        self.clicker = clicker or functools.partial(click_job, backend=backend)
+        self._own_executor = executor is None
+        self.executor = executor or concurrent.futures.ThreadPoolExecutor(
+            max_workers=DEFAULT_WORKERS, thread_name_prefix='wmc-engine')
+        self.rng = rng or random.Random()
+        self.on_tick = on_tick  # Called on the loop as on_tick(job, result, did_click)
+        self.on_outcome = on_outcome  # Called on the loop as on_outcome(job, outcome)
+        self.metrics = metrics
+        self.recorder = recorder  # Optional recording.FrameRecorder, written from the executor
+        self.jobs = []
+        self._tasks = {}  # job -> asyncio.Task
+        self._delays = {}  # job -> first delay, for jobs added before start()
+        self._click_lock = None  # One mouse: clicks from different jobs never interleave
+        self._stopped = None
+
+    @property
+    def running(self):
+        return self._stopped is not None and not self._stopped.is_set()
+
+    def add_job(self, job, delay=0):
+        """Schedule `job`, first due `delay` seconds from now (or from start())"""
+        if job.interval <= 0:
+            raise ValueError("Job interval must be greater than 0")
+        job.active = True
+        self.jobs.append(job)
+        if self.running:
+            self._spawn(job, delay)
+        else:
+            self._delays[job] = delay
+        return job
+
+    def remove_job(self, job):
+        """Cancel `job` immediately"""
+        job.active = False
+        if job in self.jobs:
+            self.jobs.remove(job)
+        self._delays.pop(job, None)
+        task = self._tasks.pop(job, None)
+        if task is not None:
+            task.cancel()
+
+    def _spawn(self, job, delay):
+        self._tasks[job] = asyncio.get_running_loop().create_task(self._run_job(job, delay),
+                                                                  name=f"wmc-{job.name}")
+
+    async def _offload(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def tick(self, job, lateness=None):
+        """Check one job's region off the loop and click if it still matches"""
+        result, should_click, error = await self._offload(check_tick, job, self.backend, None, None,
+                                                          self.recorder)
+        click_time = None
+        if should_click:
+            async with self._click_lock:
+                start = time.perf_counter()
+                await self._offload(self.clicker, job)
+                click_time = time.perf_counter() - start
+        finish_tick(job, result, should_click, click_time, lateness, error, self.metrics)
+        if self.on_tick is not None:
+            self.on_tick(job, result, should_click)
+        return should_click
+
+    async def check_outcome(self, job):
+        """Wait for the screen to settle after a click, then let the policy classify it"""
+        await asyncio.sleep(job.policy.detector.settle)
+        job.awaiting_outcome = False
+        outcome = await self._offload(job.policy.detect, self.backend, job.offset)
+        if self.on_outcome is not None:
+            self.on_outcome(job, outcome)
+        return outcome
+
+    async def _run_job(self, job, delay):
+        """One job's loop on absolute deadlines"""
+        loop = asyncio.get_running_loop()
+        job.next_due = loop.time() + delay
+        while job.active:
+            await asyncio.sleep(job.next_due - loop.time())
+            now = loop.time()
+            await self.tick(job, max(0.0, now - job.next_due))
+            if job.awaiting_outcome:
+                await self.check_outcome(job)
+                now = job.next_due = loop.time()  # Next interval counts from the outcome
+            if job.policy is not None and job.policy.stopped:
+                # Success, or out of attempts: this task ends on its own
+                job.active = False
+                self._tasks.pop(job, None)
+                if job in self.jobs:
+                    self.jobs.remove(job)
+                if not self.jobs:
+                    self._stopped.set()  # run() returns once every job has finished
+                return
+            job.next_due += job.next_interval(self.rng)
+            # Fell more than a whole interval behind: restart from now instead of bursting
+            if job.next_due <= now:
+                job.next_due = now + job.next_interval(self.rng)
+
+    def start(self):
+        """Start every added job on the running loop"""
+        self._click_lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+        for job in self.jobs:
+            self._spawn(job, self._delays.pop(job, 0))
+
+    async def run(self, duration=None):
+        """Start, run until stop() or every job finished (or `duration` seconds of engine time), then clean up"""
+        self.start()
+        try:
+            await asyncio.wait_for(self._stopped.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Cancel every job task immediately and wait for them to unwind"""
+        if self._stopped is not None:
+            self._stopped.set()
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs:
+            self._delays[job] = 0
+
+    def close(self):
+        """Release the executor the engine created"""
+        if self._own_executor:
+            # Work already handed to a thread finishes there; nothing waits for it
+            self.executor.shutdown(wait=False)
+
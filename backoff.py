@@ -0,0 +1,128 @@
+"""
+Adaptive retry intervals for wMouseClicker.
+A BackoffPolicy replaces a job's fixed or uniform random interval. After each
+click an OutcomeDetector looks at the screen once it has settled and compares
+it with a captured "success" state and a "failure" state. Failures stretch the
+interval, unrecognised screens shorten it, a skipped tick backs off, and a
+success stops the job. The interval is jittered and kept between caps.
+
+Everything runs on a capture backend and an rng, so a policy can be driven
+through a replayed frame sequence with FakeBackend and a FakeClock.
+"""
+
+import random
+
+from image_compare import CompareEngine
+
+OUTCOMES = ('success', 'failure', 'unknown', 'clicked', 'skipped')
+# Interval multiplier per outcome ('clicked' is a click with no detector)
+DEFAULT_FACTORS = {'failure': 1.5, 'unknown': 0.5, 'clicked': 1.0, 'skipped': 2.0}
+DEFAULT_JITTER = 0.1  # Interval is scaled by a uniform factor in 1 +/- jitter
+DEFAULT_SETTLE = 3.0  # Seconds between a click and looking at its outcome
+
+
+class OutcomeDetector:
+    """Tells success from failure by comparing a region with two captured states"""
+
+    def __init__(self, region, success=None, failure=None, threshold=95, settle=DEFAULT_SETTLE):
+        if success is None and failure is None:
+            raise ValueError("OutcomeDetector needs a success or a failure state")
+        self.region = tuple(region)  # (left, top, width, height)
+        self.success = CompareEngine(success) if success is not None else None
+        self.failure = CompareEngine(failure) if failure is not None else None
+        self.threshold = threshold
+        self.settle = settle
+        self.last_result = None  # TileCheck of the state that matched, if any
+
+    def classify(self, frame):
+        """'success', 'failure' or 'unknown' for an RGB array of the region"""
+        self.last_result = None
+        for outcome, engine in (('success', self.success), ('failure', self.failure)):
+            if engine is None:
+                continue
+            # Pixel diff only: a recoloured or greyed screen has the same layout
+            # as a state, and must not be taken for it
+            result = engine.check(frame, self.threshold)
+            if result.matched:
+                self.last_result = result
+                return outcome
+        return 'unknown'
+
+    def detect(self, backend, offset=(0, 0)):
+        """Capture the region, moved by `offset` (the job's search offset), and classify it"""
+        left, top, width, height = self.region
+        dx, dy = offset
+        return self.classify(backend.grab_array((left + dx, top + dy, width, height)))
+
+
+class BackoffPolicy:
+    """Interval that adapts to what the last attempts achieved"""
+
+    def __init__(self, base, min_interval=None, max_interval=None, factors=None, jitter=DEFAULT_JITTER,
+                 detector=None, stop_on_success=True, max_attempts=None):
+        if base <= 0:
+            raise ValueError("Backoff base interval must be greater than 0")
+        self.base = base  # Seconds
+        self.min_interval = min_interval if min_interval is not None else base
+        self.max_interval = max_interval if max_interval is not None else base * 8
+        if not 0 < self.min_interval <= self.max_interval:
+            raise ValueError("Backoff caps must satisfy 0 < min <= max")
+        self.factors = dict(DEFAULT_FACTORS, **(factors or {}))
+        self.jitter = jitter
+        self.detector = detector  # OutcomeDetector, or None to adapt to skips only
+        self.stop_on_success = stop_on_success
+        self.max_attempts = max_attempts  # Stop after this many clicks (None = never)
+        self.reset()
+
+    def reset(self):
+        """Back to the base interval with no history"""
+        self.current = self._clamp(self.base)
+        self.attempts = 0
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self.last_outcome = None
+        self.stopped = False
+
+    def _clamp(self, seconds):
+        return min(self.max_interval, max(self.min_interval, seconds))
+
+    def record(self, outcome):
+        """Adapt the interval to `outcome` (one of OUTCOMES)"""
+        if outcome not in self.counts:
+            raise ValueError(f"Unknown outcome: {outcome!r}")
+        self.counts[outcome] += 1
+        self.last_outcome = outcome
+        if outcome != 'skipped':
+            self.attempts += 1
+        if outcome == 'success':
+            self.current = self._clamp(self.base)
+            self.stopped = self.stop_on_success
+        else:
+            self.current = self._clamp(self.current * self.factors[outcome])
+        if self.max_attempts is not None and self.attempts >= self.max_attempts:
+            self.stopped = True
+        return outcome
+
+    def after_tick(self, did_click):
+        """Record a tick; True if the click's outcome still has to be detected"""
+        if did_click and self.detector is not None:
+            return True
+        self.record('clicked' if did_click else 'skipped')
+        return False
+
+    def detect(self, backend, offset=(0, 0)):
+        """Look at the settled screen after a click and record what it shows
+
+        `offset` is how far search mode has moved the job's target (ClickJob.offset);
+        the detector region follows it like the click does.
+        """
+        try:
+            outcome = self.detector.detect(backend, offset)
+        except Exception:
+            outcome = 'unknown'  # A failed capture proves nothing either way
+        return self.record(outcome)
+
+    def next_interval(self, rng=random):
+        """Seconds until the next attempt: the current interval with jitter, within the caps"""
+        if self.jitter:
+            return self._clamp(self.current * rng.uniform(1 - self.jitter, 1 + self.jitter))
+        return self.current
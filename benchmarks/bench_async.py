@@ -0,0 +1,114 @@
+"""
+Benchmark: AsyncEngine on virtual time.
+Runs hundreds of jobs through the asyncio engine on a VirtualTimeLoop with
+InlineExecutor, so ten simulated minutes run in a few seconds and every
+tick lands exactly on its deadline. Every click time is asserted
+against the job's schedule, the tick counts against the Scheduler on a
+FakeClock, and a run whose backoff policies all stopped must return at the
+last attempt instead of sleeping out its duration.
+Run from the repository root: python benchmarks/bench_async.py [jobs]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_engine import AsyncEngine, InlineExecutor, run_virtual  # noqa: E402
+from backoff import BackoffPolicy  # noqa: E402
+from bench_scheduler import SIMULATED_SECONDS  # noqa: E402
+from capture import FakeBackend  # noqa: E402
+from scheduler import ClickJob, FakeClock, Scheduler  # noqa: E402
+
+WINDOW = SIMULATED_SECONDS + 0.5  # Half a second past the last whole-second deadline, so no tick ties the end
+MAX_ATTEMPTS = 3
+DURATION = 36000  # Seconds a finished run must not wait out
+
+
+def make_jobs(count, screen, seed=1):
+    """(job, first delay) pairs with fixed intervals, so every deadline is known"""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        left = rng.randrange(0, screen.width - 120)
+        top = rng.randrange(0, screen.height - 40)
+        region = (left, top, 120, 40)
+        reference = screen.crop((left, top, left + 120, top + 40))
+        job = ClickJob(f"job{i}", left + 60, top + 20, region, reference, interval=rng.randint(1, 30))
+        jobs.append((job, rng.randint(0, job.interval)))
+    return jobs
+
+
+def run_async(jobs, screen, duration):
+    """Run `jobs` on virtual time; return ({job name: click times}, wall seconds, end time)"""
+    clicks = {job.name: [] for job, _ in jobs}
+
+    def clicker(job):
+        clicks[job.name].append(asyncio.get_running_loop().time())
+
+    engine = AsyncEngine(FakeBackend([screen]), clicker=clicker, executor=InlineExecutor(),
+                         rng=random.Random(2))
+    for job, delay in jobs:
+        engine.add_job(job, delay=delay)
+
+    async def main():
+        await engine.run(duration)
+        return asyncio.get_running_loop().time()
+
+    start = time.perf_counter()
+    end = run_virtual(main())
+    return clicks, time.perf_counter() - start, end
+
+
+def scheduler_ticks(jobs, screen):
+    """Ticks per job the Scheduler runs on a FakeClock over the same window"""
+    clock = FakeClock()
+    scheduler = Scheduler(FakeBackend([screen]), clicker=lambda job: None, clock=clock, rng=random.Random(2))
+    for job, delay in jobs:
+        scheduler.add_job(job, delay=delay)
+    while True:
+        due = scheduler.next_due()
+        if due >= WINDOW:
+            break
+        clock.now = due
+        scheduler.run_pending()
+    return {job.name: job.click_count for job in scheduler.jobs}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    screen = Image.effect_noise((1920, 1080), 64).convert('RGB')
+    print(f"jobs: {count}  simulated: {SIMULATED_SECONDS}s")
+
+    jobs = make_jobs(count, screen)
+    clicks, elapsed, end = run_async(jobs, screen, WINDOW)
+    ticks = sum(len(times) for times in clicks.values())
+    for job, delay in jobs:
+        expected = [delay + k * job.interval for k in range(len(clicks[job.name]))]
+        assert all(abs(at - due) < 1e-6 for at, due in zip(clicks[job.name], expected)), job.name
+        assert expected[-1] + job.interval > WINDOW > expected[-1], job.name
+    assert end == WINDOW
+    reference = scheduler_ticks(make_jobs(count, screen), screen)
+    assert {name: len(times) for name, times in clicks.items()} == reference
+    print(f"     async: ticks: {ticks}  wall: {elapsed:.3f}s  {elapsed / ticks * 1e6:.1f} us/tick  "
+          f"({SIMULATED_SECONDS / elapsed:.0f}x real time), every tick on its deadline, same ticks as Scheduler")
+
+    # Backoff policies that stop after MAX_ATTEMPTS clicks end the run early
+    jobs = make_jobs(min(count, 20), screen, seed=3)
+    for job, _ in jobs:
+        job.policy = BackoffPolicy(job.interval, jitter=0, max_attempts=MAX_ATTEMPTS)
+    clicks, elapsed, end = run_async(jobs, screen, DURATION)
+    assert all(len(times) == MAX_ATTEMPTS for times in clicks.values())
+    last = max(times[-1] for times in clicks.values())
+    assert end == last, (end, last)
+    print(f"   backoff: {len(jobs)} jobs x {MAX_ATTEMPTS} attempts, run returned at t={end:.0f}s "
+          f"(duration {DURATION}s)  wall: {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
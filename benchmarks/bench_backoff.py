@@ -0,0 +1,146 @@
+"""
+Benchmark: clicks and time per successful acquisition for retry policies.
+Replays a simulated capacity-retry page through the real Scheduler on a
+FakeClock: the monitored region shows the form, an "out of capacity" banner
+for a while after a failed click, or the success page once a click lands
+while capacity is available. Capacity comes and goes at random. Each policy
+runs on the same seeds. The safety check keeps every policy from clicking
+on the success page, but one that does not stop keeps capturing it until
+the end of the horizon.
+Run from the repository root: python benchmarks/bench_backoff.py
+"""
+
+import os
+import random
+import statistics
+import sys
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backoff import BackoffPolicy, OutcomeDetector  # noqa: E402
+from capture import CaptureBackend  # noqa: E402
+from scheduler import ClickJob, FakeClock, Scheduler  # noqa: E402
+
+REGION = (760, 620, 160, 48)
+HORIZON = 48 * 3600.0  # Simulated seconds per run
+SEEDS = 200
+CAPACITY_GAP = 3 * 3600.0  # Mean seconds without capacity
+CAPACITY_SPAN = 15 * 60.0  # Mean seconds capacity stays available
+BANNER = 60.0  # Seconds the failure banner stays up
+
+
+def state_frame(state):
+    """What the monitored region looks like in each page state"""
+    image = Image.new('RGB', REGION[2:], (243, 244, 246))
+    draw = ImageDraw.Draw(image)
+    if state == 'success':
+        draw.rectangle((0, 0, REGION[2], REGION[3]), fill=(22, 163, 74))
+        draw.text((10, 16), "Provisioning", fill=(255, 255, 255))
+    else:
+        draw.rounded_rectangle((20, 10, 140, 38), radius=4, fill=(36, 99, 235))
+        draw.text((50, 18), "Create", fill=(255, 255, 255))
+        if state == 'failure':
+            draw.rectangle((0, 0, REGION[2], 14), fill=(220, 38, 38))
+            draw.text((4, 1), "Out of capacity", fill=(255, 255, 255))
+    return image
+
+
+FRAMES = {state: state_frame(state) for state in ('form', 'failure', 'success')}
+
+
+class Site(CaptureBackend):
+    """The retry page: replays the frame for its state at the fake clock's time"""
+
+    name = "site"
+
+    def __init__(self, clock, seed):
+        super().__init__()
+        self.clock = clock
+        rng = random.Random(seed)
+        self.windows = []  # (start, end) of each capacity window
+        at = 0.0
+        while at < HORIZON:
+            at += rng.expovariate(1 / CAPACITY_GAP)
+            span = rng.expovariate(1 / CAPACITY_SPAN)
+            self.windows.append((at, at + span))
+            at += span
+        self.banner_until = -1.0
+        self.succeeded_at = None
+        self.clicks = 0
+
+    def state(self):
+        if self.succeeded_at is not None:
+            return 'success'
+        return 'failure' if self.clock() < self.banner_until else 'form'
+
+    def grab(self, region=None):
+        self.calls += 1
+        return FRAMES[self.state()]
+
+    def click(self, job):
+        now = self.clock()
+        self.clicks += 1
+        if any(start <= now < end for start, end in self.windows):
+            self.succeeded_at = now
+        else:
+            self.banner_until = now + BANNER
+
+
+def fixed(job):
+    return None
+
+
+def random_interval(job):
+    job.interval_max = 1200
+    return None
+
+
+def adaptive(job):
+    detector = OutcomeDetector(REGION, FRAMES['success'], FRAMES['failure'], settle=3.0)
+    return BackoffPolicy(job.interval, max_interval=1200, factors={'failure': 1.25}, detector=detector)
+
+
+def adaptive_eager(job):
+    detector = OutcomeDetector(REGION, FRAMES['success'], FRAMES['failure'], settle=3.0)
+    job.interval = 120
+    return BackoffPolicy(job.interval, max_interval=900, detector=detector)
+
+
+POLICIES = [('fixed 5 min', fixed), ('random 5-20 min', random_interval),
+            ('adaptive 5-20 min', adaptive), ('adaptive 2-15 min', adaptive_eager)]
+
+
+def run(make_policy, seed):
+    clock = FakeClock()
+    site = Site(clock, seed)
+    job = ClickJob("create", 840, 644, REGION, FRAMES['form'], interval=300, threshold=98)
+    job.policy = make_policy(job)
+    scheduler = Scheduler(site, clicker=site.click, clock=clock, rng=random.Random(seed))
+    scheduler.add_job(job)
+    while True:
+        due = scheduler.next_due()
+        if due is None or due > HORIZON:
+            break
+        clock.now = due
+        scheduler.run_pending()
+    return site
+
+
+def main():
+    print(f"{SEEDS} runs of {HORIZON / 3600:.0f} h, capacity every ~{CAPACITY_GAP / 3600:.0f} h "
+          f"for ~{CAPACITY_SPAN / 60:.0f} min")
+    print(f"{'policy':>18} {'success':>8} {'clicks/success':>15} {'hours to success':>17} "
+          f"{'captures':>9}")
+    for name, make_policy in POLICIES:
+        sites = [run(make_policy, seed) for seed in range(SEEDS)]
+        won = [site for site in sites if site.succeeded_at is not None]
+        clicks = sum(site.clicks for site in sites)
+        print(f"{name:>18} {len(won) / SEEDS:8.0%} {clicks / max(1, len(won)):15.1f} "
+              f"{statistics.mean(site.succeeded_at for site in won) / 3600:17.2f} "
+              f"{statistics.mean(site.calls for site in sites):9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: region grabs per second for every capture backend available.
+The fake backend always runs, so this works headless.
+Run from the repository root: python benchmarks/bench_capture.py
+"""
+
+import os
+import sys
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import BACKENDS, FakeBackend  # noqa: E402
+
+REGIONS = [(100, 100, 200, 60), (0, 0, 640, 480), (0, 0, 1920, 1080)]
+SECONDS = 1.0
+
+
+def make_backends():
+    """Instantiate every backend that works on this host"""
+    backends = [FakeBackend([Image.effect_noise((1920, 1080), 64)])]
+    for name, cls in BACKENDS.items():
+        try:
+            backends.append(cls())
+        except Exception as exc:  # Missing module or no display
+            print(f"skipping {name}: {exc}")
+    return backends
+
+
+def measure(func):
+    """Return calls per second of `func` over SECONDS"""
+    func()  # warm up
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        func()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    for backend in make_backends():
+        for region in REGIONS:
+            label = f"{region[2]}x{region[3]}"
+            try:
+                image_rate = measure(lambda: backend.grab(region))
+                array_rate = measure(lambda: backend.grab_array(region))
+            except Exception as exc:
+                print(f"{backend.name:>10} {label:>10} failed: {exc}")
+                continue
+            print(f"{backend.name:>10} {label:>10} grab: {image_rate:8.1f}/s  "
+                  f"grab_array: {array_rate:8.1f}/s")
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
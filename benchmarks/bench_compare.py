@@ -0,0 +1,93 @@
+"""
+Benchmark: PIL compare path vs the numpy CompareEngine at several region sizes.
+Also times a matching frame, where the banded check() can never exit early:
+it fails if walking several bands costs more than MAX_BANDED_RATIO times one
+flat diff. (A region small enough for one band only adds the ~1 us of
+per-call overhead, which is most of a 64x32 diff.)
+Run from the repository root: python benchmarks/bench_compare.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_compare import CompareEngine, pil_similarity  # noqa: E402
+
+SIZES = [(64, 32), (200, 60), (640, 480), (1920, 1080), (3840, 2160)]
+MAX_BANDED_RATIO = 1.2
+ROUNDS = 5
+
+
+def make_pair(width, height):
+    """Build a reference image and a slightly different live frame"""
+    reference = Image.effect_noise((width, height), 64).convert('RGB')
+    live = reference.copy()
+    live.putpixel((width // 2, height // 2), (255, 0, 0))
+    return reference, live
+
+
+def time_call(func, repeat):
+    """Return the mean seconds per call of `func` over `repeat` runs"""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def best_time(func, repeat):
+    """Fastest of ROUNDS time_call() rounds, for a ratio that timing noise cannot fail"""
+    return min(time_call(func, repeat) for _ in range(ROUNDS))
+
+
+def main():
+    print(f"{'region':>12} {'pil ms':>10} {'numpy ms':>10} {'check ms':>10} {'banded ms':>10} "
+          f"{'bands':>9} {'speedup':>8}")
+    for width, height in SIZES:
+        reference, live = make_pair(width, height)
+        engine = CompareEngine(reference)
+        repeat = max(3, int(2_000_000 / (width * height)))
+
+        pil_value = pil_similarity(reference, live)
+        np_value = engine.similarity(live)
+        assert abs(pil_value - np_value) < 1e-9, (pil_value, np_value)
+
+        pil_time = time_call(lambda: pil_similarity(reference, live), repeat)
+        np_time = time_call(lambda: engine.similarity(live), repeat)
+        check_time = time_call(lambda: engine.exceeds_threshold(live, 100), repeat)
+        banded_time = time_call(lambda: engine.check(live, 100), repeat)
+        result = engine.check(live, 100)
+        bands = f"{result.tiles_examined}/{result.tiles_total}"
+        print(f"{width:>5}x{height:<6} {pil_time * 1000:>10.3f} {np_time * 1000:>10.3f} "
+              f"{check_time * 1000:>10.3f} {banded_time * 1000:>10.3f} {bands:>9} "
+              f"{pil_time / np_time:>7.1f}x")
+
+    # A matching frame (the click case) walks every band: it must cost about one flat diff
+    print(f"\nmatching frame, threshold 100\n{'region':>12} {'flat ms':>10} {'banded ms':>10} {'ratio':>8}")
+    failures = []
+    for width, height in SIZES:
+        reference, _ = make_pair(width, height)
+        engine = CompareEngine(reference)
+        frame = np.array(reference)
+        repeat = max(3, int(2_000_000 / (width * height)))
+        assert engine.check(frame, 100).matched
+        flat_time = best_time(lambda: engine.exceeds_threshold(frame, 100), repeat)
+        banded_time = best_time(lambda: engine.check(frame, 100), repeat)
+        ratio = banded_time / flat_time
+        bands = engine.check(frame, 100).tiles_total
+        print(f"{width:>5}x{height:<6} {flat_time * 1000:>10.3f} {banded_time * 1000:>10.3f} {ratio:>7.2f}x"
+              f" {bands:>6} band{'s' if bands > 1 else ''}")
+        if bands > 1 and ratio > MAX_BANDED_RATIO:
+            failures.append(f"{width}x{height} banded check costs {ratio:.2f}x a flat diff")
+    for failure in failures:
+        print(f"regression: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
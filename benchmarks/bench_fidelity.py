@@ -0,0 +1,112 @@
+"""
+Benchmark: accuracy vs speed of the comparison fidelity levels.
+Synthetic UI frames (a button on a panel) are compared in typical variants:
+unchanged, sub-pixel shift, disabled/recoloured, changed label, blinking
+caret, a dialog over part of the region, capture noise. Each fidelity level
+is scored on how often its decision agrees with the full RGB compare, how
+often it escalated, its mean time per decision and its mean time when it
+decided without escalating.
+Run from the repository root: python benchmarks/bench_fidelity.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_compare import CompareEngine  # noqa: E402
+
+FIDELITIES = ['rgb', 'gray', 'gray/2', 'gray/4', 'gray/8', 'gray/8,gray/2']
+THRESHOLDS = [90, 95, 98, 99]
+SIZES = [(200, 60), (640, 480)]
+
+
+def draw_button(size, label="Create", fill=(36, 99, 235), text=(255, 255, 255), offset=0):
+    """A flat button with a label, centred on a light panel"""
+    width, height = size
+    image = Image.new('RGB', size, (243, 244, 246))
+    draw = ImageDraw.Draw(image)
+    box = (width // 6 + offset, height // 4, width * 5 // 6 + offset, height * 3 // 4)
+    draw.rounded_rectangle(box, radius=max(2, height // 10), fill=fill)
+    for i in range(max(1, width // 200)):
+        draw.text((box[0] + 10 + i * 60, box[1] + (box[3] - box[1]) // 3), label, fill=text)
+    return image
+
+
+def variants(size):
+    """(name, frame) pairs compared against the plain button"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    base = np.asarray(draw_button(size))
+    caret = base.copy()
+    caret[height // 3:height * 2 // 3, width // 2:width // 2 + 2] = 0
+    dialog = base.copy()
+    dialog[height // 2:, width // 2:] = (255, 255, 255)
+    noisy = np.clip(base + rng.normal(0, 3, base.shape), 0, 255).astype(np.uint8)
+    return [
+        ('unchanged', base),
+        ('shift 1px', np.asarray(draw_button(size, offset=1))),
+        ('disabled', np.asarray(draw_button(size, fill=(156, 163, 175)))),
+        ('recoloured', np.asarray(draw_button(size, fill=(220, 38, 38)))),
+        ('label', np.asarray(draw_button(size, label="Retry!"))),
+        ('caret', caret),
+        ('dialog', dialog),
+        ('noise', noisy),
+    ]
+
+
+def time_decide(engine, frame, threshold, repeat):
+    engine.decide(frame, threshold)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        engine.decide(frame, threshold)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    for size in SIZES:
+        reference = np.asarray(draw_button(size))
+        cases = variants(size)
+        truth = CompareEngine(reference)
+        expected = {(name, t): truth.decide(frame, t).matched
+                    for name, frame in cases for t in THRESHOLDS}
+        repeat = max(5, 400_000 // (size[0] * size[1]))
+
+        print(f"\nregion {size[0]}x{size[1]}  ({len(cases)} variants x {len(THRESHOLDS)} thresholds)")
+        print(f"{'fidelity':>14} {'agree':>7} {'escalated':>10} {'us/decision':>12} {'speedup':>8} "
+              f"{'us at level':>12}")
+        base_time = None
+        for fidelity in FIDELITIES:
+            engine = CompareEngine(reference, fidelity=fidelity)
+            agree = escalated = 0
+            seconds = 0.0
+            at_level = []  # Seconds of decisions a reduced level made on its own
+            wrong = []
+            for name, frame in cases:
+                for t in THRESHOLDS:
+                    result = engine.decide(frame, t)
+                    if result.matched == expected[(name, t)]:
+                        agree += 1
+                    else:
+                        wrong.append(f"{name}@{t}")
+                    elapsed = time_decide(engine, frame, t, repeat)
+                    seconds += elapsed
+                    if fidelity != 'rgb' and result.level is None:
+                        escalated += 1
+                    elif fidelity != 'rgb':
+                        at_level.append(elapsed)
+            per_decision = seconds / (len(cases) * len(THRESHOLDS))
+            base_time = base_time or per_decision
+            total = len(cases) * len(THRESHOLDS)
+            print(f"{fidelity:>14} {agree / total:7.1%} {escalated / total:10.1%} "
+                  f"{per_decision * 1e6:12.1f} {base_time / per_decision:7.2f}x "
+                  + (f"{sum(at_level) / len(at_level) * 1e6:12.1f}" if at_level else f"{'-':>12}")
+                  + (f"  wrong: {', '.join(wrong)}" if wrong else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import-time budget for the wMouseClicker entry points.
+Runs each module under `python -X importtime` in a fresh interpreter, reports
+its cumulative import time, and fails if it pulls in a dependency that should
+only load on first use, or if it got slower than the stored baseline
+(benchmarks/import_baseline.json) by more than the tolerance, as suite.py
+does for the pipeline.
+Run from the repository root:
+    python benchmarks/bench_import.py                  compare against the baseline
+    python benchmarks/bench_import.py --save-baseline  replace the baseline
+    python benchmarks/bench_import.py --budget-ms N    fixed budget instead
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> dependencies that must not be imported just by importing it
+ENTRY_POINTS = {
+    'clicker_cli': ['tkinter', 'pyautogui', 'keyboard', 'mss'],
+    'mouse_clicker': ['pyautogui', 'keyboard', 'mss'],
+}
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_baseline.json')
+DEFAULT_TOLERANCE = 0.30  # Allowed relative slowdown, the same as suite.py
+RUNS = 5
+
+
+def import_profile(module):
+    """Return {imported module: cumulative microseconds} for one fresh import"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--baseline', default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store these times as the baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown per module (default 0.30)")
+    parser.add_argument('--budget-ms', type=float, default=None, help="fixed budget instead of the baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.budget_ms is None and not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    failures = []
+    results = {}
+    for module, forbidden in ENTRY_POINTS.items():
+        try:
+            profiles = [import_profile(module) for _ in range(RUNS)]
+        except RuntimeError as exc:
+            print(f"{module:>14}: skipped ({exc})")
+            continue
+        best_ms = min(p[module] for p in profiles) / 1000
+        results[f'import.{module}'] = {'value': round(best_ms, 3), 'unit': 'ms', 'better': 'lower'}
+        budget = args.budget_ms
+        if budget is None and f'import.{module}' in baseline:
+            budget = baseline[f'import.{module}']['value'] * (1 + args.tolerance)
+        loaded = [name for name in forbidden if name in profiles[0]]
+        status = "ok" if (budget is None or best_ms <= budget) and not loaded else "FAIL"
+        shown = f"budget {budget:.1f} ms" if budget is not None else "no baseline"
+        print(f"{module:>14}: {best_ms:8.1f} ms ({shown})  {status}")
+        if budget is not None and best_ms > budget:
+            failures.append(f"{module} import took {best_ms:.1f} ms")
+        if loaded:
+            failures.append(f"{module} eagerly imports {', '.join(loaded)}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                                'runs': RUNS},
+                       'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+    elif args.budget_ms is None and not baseline:
+        print("No baseline; run with --save-baseline first")
+    for failure in failures:
+        print(f"regression: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark: incremental (dirty-block) compare vs comparing from scratch.
+Replays tick sequences a fast-polling job sees: a static screen, a blinking
+caret, a ticking clock in one corner, and a frame that changes completely
+every tick. Each frame goes through the normal decide() (banded early
+exit), the exact full diff, and an incremental engine. Every incremental
+result is checked against the full diff: the similarity must be identical
+and the decision the same.
+Run from the repository root: python benchmarks/bench_incremental.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_compare import CompareEngine  # noqa: E402
+
+SIZES = [(200, 60), (640, 480), (1920, 1080)]
+THRESHOLD = 99
+TICKS = 200
+
+
+def screen(size):
+    width, height = size
+    image = Image.new('RGB', size, (243, 244, 246))
+    draw = ImageDraw.Draw(image)
+    for y in range(0, height, 24):
+        draw.text((8, y + 4), "Instance shape  VM.Standard.A1.Flex  Availability domain AD-1", fill=(40, 40, 40))
+    return np.asarray(image)
+
+
+def sequences(size):
+    """name -> list of frames"""
+    width, height = size
+    base = screen(size)
+    rng = np.random.default_rng(0)
+
+    def caret(tick):
+        frame = base.copy()
+        if tick % 2:
+            frame[height // 3:height // 3 + 16, width // 2:width // 2 + 2] = 0
+        return frame
+
+    def clock(tick):
+        image = Image.fromarray(base)
+        ImageDraw.Draw(image).text((width - 60, height - 14), f"{tick // 60:02d}:{tick % 60:02d}", fill=(0, 0, 0))
+        return np.asarray(image)
+
+    noise = [rng.integers(0, 256, base.shape, dtype=np.uint8) for _ in range(4)]
+    return {
+        'static': [base] * TICKS,
+        'caret': [caret(t) for t in range(TICKS)],
+        'clock': [clock(t) for t in range(TICKS)],
+        'full change': [noise[t % len(noise)] for t in range(TICKS)],
+    }
+
+
+def per_tick(func, frames):
+    func(frames[0])
+    start = time.perf_counter()
+    for frame in frames:
+        func(frame)
+    return (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    print(f"threshold {THRESHOLD}, {TICKS} ticks per sequence (us per tick)")
+    print(f"{'region':>10} {'sequence':>12} {'decide':>9} {'full diff':>10} {'incremental':>12} "
+          f"{'speedup':>8} {'blocks/tick':>12}")
+    for size in SIZES:
+        reference = screen(size)
+        engine = CompareEngine(reference)
+        full = CompareEngine(reference)
+        for name, frames in sequences(size).items():
+            incremental = CompareEngine(reference, incremental=True)
+            rediffed = 0
+            for frame in frames:
+                result = incremental.decide(frame, THRESHOLD)
+                exact = full.similarity(frame)
+                assert result.similarity == exact and result.matched == (exact >= THRESHOLD), name
+                rediffed += result.tiles_examined
+            decide = per_tick(lambda f: engine.decide(f, THRESHOLD), frames)
+            diff = per_tick(lambda f: full.check(f, THRESHOLD, bands=1), frames)
+            fresh = CompareEngine(reference, incremental=True)
+            inc = per_tick(lambda f: fresh.decide(f, THRESHOLD), frames)
+            print(f"{f'{size[0]}x{size[1]}':>10} {name:>12} {decide * 1e6:9.1f} {diff * 1e6:10.1f} "
+                  f"{inc * 1e6:12.1f} {diff / inc:7.1f}x {rediffed / len(frames):12.1f}")
+
+
+if __name__ == "__main__":
+    main()
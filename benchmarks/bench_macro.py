@@ -0,0 +1,81 @@
+"""
+Benchmark: macro playback timing on the fake input backend.
+First with a FakeClock, where every event must land exactly on its schedule,
+then on the real clock: how late each batch is sent with and without the
+final spin, and how long a job's click + rest click takes compared with the
+fixed pyautogui.PAUSE of 0.1 s after each of its three calls it replaced.
+Run from the repository root: python benchmarks/bench_macro.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from macro import FakeInput, Macro, MacroPlayer, Step, click_macro  # noqa: E402
+from scheduler import ClickJob, DeadlineTimer, FakeClock  # noqa: E402
+
+OLD_PAUSE = 0.1
+OLD_CALLS = 3  # moveTo, click, rest click
+RUNS = 20
+
+
+def sequence():
+    """Login-style macro: click, type, tab, type, enter, wait, click"""
+    return Macro([
+        Step('click', 400, 300),
+        Step('type', text="user", delay=0.05),
+        Step('key', keys=('tab',)),
+        Step('type', text="secret"),
+        Step('key', keys=('enter',), delay=0.02),
+        Step('wait', delay=0.1),
+        Step('click', 640, 420, delay=0.01),
+    ])
+
+
+def fake_clock():
+    macro = sequence()
+    clock = FakeClock()
+    fake = FakeInput(clock)
+    player = MacroPlayer(fake, timer=DeadlineTimer(clock, clock.wait), spin=0)
+    result = player.play(macro)
+    expected, at = [], 0.0
+    for step in macro.steps:
+        at += step.delay
+        if step.action != 'wait':
+            expected.append(at)
+    times = [t for t, _, _ in fake.events]
+    assert result.completed and times == expected, (times, expected)
+    print(f"fake clock: {len(fake.events)} events in {fake.batches} batches, all on schedule")
+
+
+def real_clock(spin):
+    macro = sequence()
+    fake = FakeInput()
+    player = MacroPlayer(fake, spin=spin)
+    late = []
+    for _ in range(RUNS):
+        late.extend(player.play(macro).lateness)
+    return statistics.mean(late), max(late)
+
+
+def main():
+    fake_clock()
+    print(f"\n{'spin ms':>8} {'mean late ms':>13} {'max late ms':>12}")
+    for spin in (0, 0.002):
+        mean, worst = real_clock(spin)
+        print(f"{spin * 1000:>8.1f} {mean * 1000:>13.3f} {worst * 1000:>12.3f}")
+
+    job = ClickJob("job", 812, 640, rest_position=(400, 300))
+    player = MacroPlayer(FakeInput())
+    start = time.perf_counter()
+    player.play(click_macro(job))
+    elapsed = time.perf_counter() - start
+    print(f"\nclick + rest click: {elapsed * 1000:.1f} ms "
+          f"(fixed pauses: {OLD_PAUSE * OLD_CALLS * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
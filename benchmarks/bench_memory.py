@@ -0,0 +1,58 @@
+"""
+Benchmark: RSS over many steady-state capture + compare ticks.
+Uses the fake capture backend so it runs headless. RSS should stay flat.
+Run from the repository root: python benchmarks/bench_memory.py [ticks]
+"""
+
+import os
+import sys
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import FakeBackend  # noqa: E402
+from image_compare import CompareEngine  # noqa: E402
+
+REGION = (100, 100, 200, 60)
+SAMPLES = 10
+
+
+def rss_kb():
+    """Current resident set size in KiB (Linux /proc, else peak RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    screen = Image.effect_noise((800, 600), 64).convert('RGB')
+    changed = screen.copy()
+    changed.paste((255, 0, 0), (150, 120, 170, 140))
+    backend = FakeBackend([screen, changed])
+
+    left, top, width, height = REGION
+    engine = CompareEngine(screen.crop((left, top, left + width, top + height)))
+
+    step = max(1, ticks // SAMPLES)
+    start = time.perf_counter()
+    baseline = rss_kb()
+    print(f"{'tick':>8} {'rss KiB':>10} {'delta':>8}")
+    for tick in range(1, ticks + 1):
+        backend.grab_into(REGION, engine.live)
+        engine.decide(engine.live, 100)
+        if tick % step == 0:
+            rss = rss_kb()
+            print(f"{tick:>8} {rss:>10} {rss - baseline:>+8}")
+    elapsed = time.perf_counter() - start
+    print(f"{ticks / elapsed:.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
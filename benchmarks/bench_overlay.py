@@ -0,0 +1,88 @@
+"""
+Benchmark: F6 overlay open cost and per-drag-event cost.
+Headless part: preparing the overlay background from a full-screen capture,
+old path (full-resolution PIL screenshot converted for Tk, plus the full crop
+source kept as an image) vs the sampled background and lazy crop.
+With a display ($DISPLAY or Windows), it also opens the real ScreenSelector
+on a fake backend and replays drag events through Tk.
+Run from the repository root: python benchmarks/bench_overlay.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import FakeBackend  # noqa: E402
+from mouse_clicker import ScreenSelector, overlay_background  # noqa: E402
+
+SCREENS = [(1920, 1080), (3840, 2160), (3 * 3840, 2160)]
+DRAG_EVENTS = 500
+
+
+def time_call(func, repeat=5):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def headless():
+    print(f"{'screen':>12} {'old ms':>9} {'new ms':>9} {'scale':>6} {'crop ms':>8}")
+    for width, height in SCREENS:
+        frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+        def old():
+            # pyautogui.screenshot() result, then RGB bytes for PhotoImage at full size
+            image = Image.fromarray(frame)
+            image.tobytes()
+
+        def new():
+            background, _ = overlay_background(frame)
+            background.tobytes()
+
+        _, scale = overlay_background(frame)
+        crop = time_call(lambda: Image.fromarray(np.ascontiguousarray(frame[400:460, 800:1000])), 50)
+        print(f"{f'{width}x{height}':>12} {time_call(old) * 1000:9.1f} {time_call(new) * 1000:9.1f} "
+              f"{scale:>6} {crop * 1000:8.3f}")
+
+
+def with_display():
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.withdraw()
+    width, height = root.winfo_screenwidth(), root.winfo_screenheight()
+    screen = Image.fromarray(np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8))
+    selector = ScreenSelector(lambda *args: None, FakeBackend([screen]))
+    selector.start_selection()
+    root.update()
+    print(f"\noverlay open ({width}x{height}): {selector.open_seconds * 1000:.1f} ms")
+
+    selector.step = 2
+    selector.canvas.event_generate('<Button-1>', x=100, y=100)
+    for i in range(DRAG_EVENTS):
+        selector.canvas.event_generate('<B1-Motion>', x=110 + i % 400, y=110 + i % 300)
+    root.update()
+    print(f"drag: {selector.drag_events} events, "
+          f"{selector.drag_seconds / max(1, selector.drag_events) * 1e6:.1f} us/event "
+          f"(canvas items: {len(selector.canvas.find_all())})")
+    selector.on_cancel(None)
+    root.destroy()
+
+
+def main():
+    headless()
+    if os.environ.get('DISPLAY') or sys.platform == 'win32':
+        with_display()
+    else:
+        print("\nNo display: skipped the Tk open/drag measurement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: many large regions due at once, compared on the scheduler thread
+vs in a ComparePool of worker processes (shared-memory frames).
+Also checks that both paths return identical TileCheck results.
+Run from the repository root: python benchmarks/bench_pool.py [regions] [workers]
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import FakeBackend  # noqa: E402
+from compare_pool import ComparePool  # noqa: E402
+from image_compare import rect_mask  # noqa: E402
+from scheduler import ClickJob, FakeClock, Scheduler  # noqa: E402
+
+REGION = (640, 480)
+TICKS = 10
+
+
+def make_screens():
+    """Reference screen and a live screen with a few changed areas"""
+    screen = Image.effect_noise((1920, 1080), 64).convert('RGB')
+    live = np.array(screen)
+    live[100:300, 100:900] //= 2
+    live[500:520, :] = 255
+    return screen, Image.fromarray(live)
+
+
+def simulate(screen, live, count, pool):
+    """Run TICKS rounds with `count` jobs all due together; return (ticks, seconds)"""
+    rng = random.Random(1)
+    width, height = REGION
+    clock = FakeClock()
+    ticks = []
+    scheduler = Scheduler(FakeBackend([live]), clicker=lambda job: None, clock=clock, pool=pool,
+                          batch_capture=False,
+                          on_tick=lambda job, result, did_click: ticks.append((job.name, result, did_click)))
+    for i in range(count):
+        left, top = rng.randrange(0, 1920 - width), rng.randrange(0, 1080 - height)
+        job = ClickJob(f"job{i}", left, top, (left, top, width, height),
+                       screen.crop((left, top, left + width, top + height)),
+                       interval=1, threshold=rng.choice([90, 95, 99, 100]))
+        if i % 3 == 0:
+            job.engine.set_mask(rect_mask(job.engine.ref_array.shape, [(0, 0, 100, 100)]))
+        scheduler.add_job(job)
+    scheduler.run_pending()  # warm up (workers start, blocks attach)
+    ticks.clear()
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        clock.advance(1)
+        scheduler.run_pending()
+    return ticks, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    screen, live = make_screens()
+    print(f"regions: {count} x {REGION[0]}x{REGION[1]}  workers: {workers}  cores: {os.cpu_count()}")
+
+    serial, serial_time = simulate(screen, live, count, None)
+    pool = ComparePool(workers)
+    try:
+        pooled, pool_time = simulate(screen, live, count, pool)
+    finally:
+        pool.close()
+
+    same = serial == pooled
+    decisions = count * TICKS
+    print(f"{'serial':>8}: {decisions / serial_time:8.1f} decisions/s")
+    print(f"{'pool':>8}: {decisions / pool_time:8.1f} decisions/s  ({serial_time / pool_time:.2f}x)")
+    print(f"identical results: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
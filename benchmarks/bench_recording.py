@@ -0,0 +1,93 @@
+"""
+Benchmark: frame recorder cost and size, and replay decode speed.
+Records synthetic tick sequences (static screen, blinking caret, a counter
+that changes every tick, capture noise) through FrameRecorder and reports
+the time per recorded tick, the bytes per frame against raw frames, and how
+many frames per second read_recording decodes.
+Run from the repository root: python benchmarks/bench_recording.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import types
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_compare import CompareEngine  # noqa: E402
+from recording import FrameRecorder, read_recording  # noqa: E402
+
+SIZES = [(200, 60), (640, 480)]
+TICKS = 500
+
+
+def panel(size):
+    width, height = size
+    image = Image.new('RGB', size, (243, 244, 246))
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle((width // 6, height // 4, width * 5 // 6, height * 3 // 4), radius=6, fill=(36, 99, 235))
+    draw.text((width // 6 + 10, height // 3), "Create", fill=(255, 255, 255))
+    return np.asarray(image)
+
+
+def sequences(size):
+    """name -> function(tick) returning that tick's frame"""
+    width, height = size
+    base = panel(size)
+    rng = np.random.default_rng(0)
+    noise = [np.clip(base + rng.normal(0, 2, base.shape), 0, 255).astype(np.uint8) for _ in range(16)]
+
+    def caret(tick):
+        frame = base.copy()
+        if tick % 2:
+            frame[height // 3:height * 2 // 3, width // 2:width // 2 + 2] = 0
+        return frame
+
+    def counter(tick):
+        image = Image.fromarray(base)
+        ImageDraw.Draw(image).text((4, 4), f"{tick:06d}", fill=(0, 0, 0))
+        return np.asarray(image)
+
+    return {
+        'static': lambda tick: base,
+        'caret': caret,
+        'counter': counter,
+        'noise': lambda tick: noise[tick % len(noise)],
+    }
+
+
+def main():
+    print(f"{TICKS} ticks per sequence")
+    print(f"{'region':>8} {'sequence':>9} {'us/tick':>8} {'bytes/frame':>12} {'raw/frame':>10} "
+          f"{'ratio':>7} {'replay fps':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            reference = panel(size)
+            for name, make_frame in sequences(size).items():
+                path = os.path.join(directory, f"{name}.wmcr")
+                job = types.SimpleNamespace(name="job", engine=CompareEngine(reference), threshold=100,
+                                            region=(0, 0) + size, last_frame=None, last_error=None)
+                frames = [make_frame(tick) for tick in range(TICKS)]
+                recorder = FrameRecorder(path)
+                start = time.perf_counter()
+                for frame in frames:
+                    job.last_frame = frame
+                    recorder.record(job, None, True)
+                elapsed = time.perf_counter() - start
+                recorder.close()
+
+                start = time.perf_counter()
+                decoded = sum(1 for record in read_recording(path) if hasattr(record, 'frame'))
+                replay = time.perf_counter() - start
+                per_frame = os.path.getsize(path) / TICKS
+                raw = reference.nbytes
+                print(f"{f'{size[0]}x{size[1]}':>8} {name:>9} {elapsed / TICKS * 1e6:8.1f} {per_frame:12.0f} "
+                      f"{raw:10d} {raw / per_frame:6.0f}x {decoded / replay:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: scheduler overhead with hundreds of jobs on one timer.
+Drives the Scheduler with a fake clock, fake capture backend and a no-op
+clicker, so it runs headless and deterministically.
+Run from the repository root: python benchmarks/bench_scheduler.py [jobs]
+"""
+
+import os
+import random
+import sys
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import FakeBackend  # noqa: E402
+from scheduler import ClickJob, FakeClock, Scheduler  # noqa: E402
+
+SIMULATED_SECONDS = 600
+
+
+def make_jobs(count, screen, rng):
+    """Build `count` jobs with random regions and intervals on `screen`"""
+    jobs = []
+    for i in range(count):
+        left = rng.randrange(0, screen.width - 120)
+        top = rng.randrange(0, screen.height - 40)
+        region = (left, top, 120, 40)
+        reference = screen.crop((left, top, left + 120, top + 40))
+        interval = rng.randint(1, 30)
+        jobs.append(ClickJob(f"job{i}", left + 60, top + 20, region, reference,
+                             interval=interval, interval_max=interval * 2))
+    return jobs
+
+
+def simulate(count, batch_capture):
+    """Run `count` jobs for SIMULATED_SECONDS; return (scheduler, ticks, wall seconds)"""
+    rng = random.Random(1)
+    screen = Image.effect_noise((1920, 1080), 64).convert('RGB')
+    clock = FakeClock()
+    scheduler = Scheduler(FakeBackend([screen]), clicker=lambda job: None,
+                          clock=clock, rng=random.Random(2), batch_capture=batch_capture)
+    for job in make_jobs(count, screen, rng):
+        scheduler.add_job(job, delay=rng.randint(0, job.interval))
+
+    ticks = 0
+    start = time.perf_counter()
+    while clock.now < SIMULATED_SECONDS:
+        clock.now = scheduler.next_due()
+        ticks += scheduler.run_pending()
+    return scheduler, ticks, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"jobs: {count}  simulated: {SIMULATED_SECONDS}s")
+    for batch_capture in (False, True):
+        scheduler, ticks, elapsed = simulate(count, batch_capture)
+        clicks = sum(job.click_count for job in scheduler.jobs)
+        label = "batched" if batch_capture else "per-region"
+        print(f"{label:>10}: ticks: {ticks}  clicks: {clicks}  "
+              f"captures: {scheduler.backend.calls} ({scheduler.backend.calls / SIMULATED_SECONDS:.1f}/s)  "
+              f"wall: {elapsed:.3f}s  {elapsed / ticks * 1e6:.1f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
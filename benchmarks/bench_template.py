@@ -0,0 +1,61 @@
+"""
+Benchmark: locating a moved target with the pyramid matcher vs brute force.
+Brute force is a full-resolution exhaustive SAD, the same work as a naive
+locateOnScreen; it is only run for the smaller windows.
+Run from the repository root: python benchmarks/bench_template.py
+"""
+
+import os
+import sys
+import time
+
+from PIL import Image, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from template_match import TemplateMatcher, exhaustive_sad, to_gray  # noqa: E402
+
+TEMPLATE = (200, 60)  # width, height
+MARGINS = [10, 25, 50, 100, 200, 400]
+BRUTE_FORCE_MAX_MARGIN = 50
+
+
+def time_call(func, repeat=5):
+    """Return (mean seconds per call, last result)"""
+    result = func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    screen = np.asarray(Image.effect_noise((1920, 1080), 80)
+                        .filter(ImageFilter.GaussianBlur(2)).convert('RGB'))
+    width, height = TEMPLATE
+    left, top = 860, 510
+    template = screen[top:top + height, left:left + width]
+    matcher = TemplateMatcher(template)
+
+    print(f"levels: {matcher.levels}")
+    print(f"{'margin':>7} {'window':>11} {'pyramid ms':>11} {'brute ms':>9} {'found':>10}")
+    for margin in MARGINS:
+        shift = margin // 2  # Target moved by half the margin
+        win_left, win_top = left - margin - shift, top - margin + shift
+        window = screen[win_top:win_top + height + 2 * margin, win_left:win_left + width + 2 * margin]
+        pyramid_time, match = time_call(lambda: matcher.locate(window))
+        found = (match.x - margin, match.y - margin)
+        assert found == (shift, -shift), (found, shift)
+
+        brute = "-"
+        if margin <= BRUTE_FORCE_MAX_MARGIN:
+            brute_time, _ = time_call(lambda: exhaustive_sad(to_gray(window), to_gray(template)), repeat=1)
+            brute = f"{brute_time * 1000:.1f}"
+        size = f"{window.shape[1]}x{window.shape[0]}"
+        print(f"{margin:>7} {size:>11} {pyramid_time * 1000:>11.2f} {brute:>9} {str(found):>10}")
+
+
+if __name__ == "__main__":
+    main()
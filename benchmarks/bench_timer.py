@@ -0,0 +1,62 @@
+"""
+Schedule accuracy of DeadlineTimer over thousands of simulated intervals.
+A fake clock oversleeps every wait by a random amount, like a loaded host.
+Fire times must stay on the absolute schedule (no accumulated drift).
+Run from the repository root: python benchmarks/bench_timer.py [intervals]
+"""
+
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import DeadlineTimer, FakeClock  # noqa: E402
+
+MAX_OVERSLEEP = 0.02  # Seconds
+
+
+class JitteryClock(FakeClock):
+    """FakeClock whose waits overshoot by up to MAX_OVERSLEEP"""
+
+    def __init__(self, rng):
+        super().__init__()
+        self.rng = rng
+        self.waits = 0
+
+    def wait(self, event, timeout):
+        self.waits += 1
+        return super().wait(event, timeout + self.rng.uniform(0, MAX_OVERSLEEP))
+
+
+def main():
+    intervals = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(7)
+    clock = JitteryClock(rng)
+    timer = DeadlineTimer(clock=clock, wait=clock.wait)
+
+    ticks = []
+    start = clock()
+    deadline = start
+    worst = 0.0
+    for _ in range(intervals):
+        deadline += rng.randint(1, 20)
+        assert timer.wait_until(deadline, on_tick=ticks.append)
+        worst = max(worst, clock() - deadline)
+    drift = clock() - deadline
+
+    # Stop must cut a wait short on the real clock too
+    real = DeadlineTimer()
+    threading.Timer(0.05, real.stop).start()
+    stopped = not real.sleep(60)
+
+    print(f"intervals: {intervals}  waits: {clock.waits}  countdown ticks: {len(ticks)}")
+    print(f"worst lateness: {worst * 1000:.2f} ms  final drift: {drift * 1000:.2f} ms  "
+          f"stop honoured: {stopped}")
+    assert worst <= MAX_OVERSLEEP, "fire time later than one oversleep"
+    assert stopped, "stop() did not interrupt the wait"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: worker -> Tk update traffic through UIChannel.
+Worker threads post status/match updates as fast as a busy click loop would;
+a stand-in for the Tk thread drains the channel every REFRESH_MS. The number
+of repaints stays at the refresh rate however many workers post.
+Run from the repository root: python benchmarks/bench_ui.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui_channel import UIChannel  # noqa: E402
+
+REFRESH_MS = 100
+DURATION = 2.0
+
+
+def run(workers, post_interval):
+    """Post from `workers` threads for DURATION seconds; return (posts, repaints)"""
+    channel = UIChannel()
+    stop = threading.Event()
+
+    def worker(index):
+        tick = 0
+        while not stop.is_set():
+            tick += 1
+            channel.post(status=f"job{index} tick {tick}", match=(tick, 0, 99.5, True, None))
+            if post_interval:
+                time.sleep(post_interval)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + DURATION
+    while time.monotonic() < deadline:
+        time.sleep(REFRESH_MS / 1000)
+        channel.take()  # One repaint per refresh, if anything changed
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return channel.posts, channel.deliveries
+
+
+def main():
+    print(f"refresh every {REFRESH_MS} ms for {DURATION:.0f} s")
+    print(f"{'workers':>8} {'posts':>10} {'repaints':>9} {'repaints/s':>11}")
+    for workers, interval in ((1, 0.01), (10, 0.01), (100, 0.01), (4, 0)):
+        posts, repaints = run(workers, interval)
+        print(f"{workers:>8} {posts:>10} {repaints:>9} {repaints / DURATION:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: watch-mode reaction latency and CPU use at several poll rates.
+A fake screen switches to the matching state every few seconds; the
+watcher must click promptly while keeping CPU use low.
+Run from the repository root: python benchmarks/bench_watch.py [seconds per rate]
+"""
+
+import os
+import sys
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import FakeBackend  # noqa: E402
+from scheduler import ClickJob  # noqa: E402
+from watch import Watcher  # noqa: E402
+
+RATES = [10, 20, 30]
+REGION = (200, 150, 320, 120)
+SWITCH_EVERY = 1.5  # Seconds the screen stays in each state
+
+
+class TimedBackend(FakeBackend):
+    """Shows frames[0] and frames[1] alternately, switching on the wall clock"""
+
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.start = time.monotonic()
+
+    def advance(self):
+        self.index = int((time.monotonic() - self.start) / SWITCH_EVERY) % len(self.frames)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 6.0
+    ready = Image.effect_noise((800, 600), 64).convert('RGB')
+    busy = ready.copy()
+    busy.paste((40, 40, 40), (200, 150, 520, 270))
+    left, top, width, height = REGION
+    reference = ready.crop((left, top, left + width, top + height))
+
+    print(f"{'rate':>6} {'polls':>6} {'clicks':>6} {'cpu %':>6} {'busy ms':>8} "
+          f"{'lat mean':>9} {'lat max':>8}")
+    for rate in RATES:
+        job = ClickJob("watch", 360, 210, region=REGION, reference=reference)
+        backend = TimedBackend([busy, ready])
+        watcher = Watcher(job, backend, clicker=lambda job: None, rate=rate, min_gap=SWITCH_EVERY * 2,
+                          edge=True)
+        cpu_start = time.process_time()
+        wall_start = time.monotonic()
+        watcher.start()
+        time.sleep(seconds)
+        watcher.stop()
+        cpu = (time.process_time() - cpu_start) / (time.monotonic() - wall_start) * 100
+        report = watcher.report()
+        print(f"{rate:>6} {report['polls']:>6} {report['clicks']:>6} {cpu:>6.1f} "
+              f"{report['mean_busy_ms']:>8.2f} {report.get('latency_mean_ms', 0):>7.1f}ms "
+              f"{report.get('latency_max_ms', 0):>6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark suite: capture -> compare -> click pipeline, with a stored baseline.
+Uses the fake capture backend, a fake clock and a counting fake clicker, so
+it runs headless. Results are written as JSON and compared against
+benchmarks/baseline.json; any metric that got worse by more than the
+tolerance is reported and the exit status is 1.
+
+Run from the repository root:
+    python benchmarks/suite.py                      compare against the baseline
+    python benchmarks/suite.py --output out.json    also write the results
+    python benchmarks/suite.py --save-baseline      replace the baseline
+    python benchmarks/suite.py --quick              fewer repeats (smoke run)
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import types
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from capture import FakeBackend  # noqa: E402
+from image_compare import CompareEngine, rect_mask  # noqa: E402
+from mouse_clicker import MouseClicker, render_preview  # noqa: E402
+from scheduler import ClickJob, FakeClock, Scheduler  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.30  # Allowed relative slowdown before a metric is a regression
+
+SIZES = [(64, 32), (200, 60), (640, 480), (1920, 1080)]
+PREVIEW_SIZES = [(200, 60), (640, 480), (1920, 1080)]
+E2E_TICKS = 2000
+ROUNDS = 7
+
+
+class FakeInput:
+    """Stand-in for the click path: counts clicks instead of moving the mouse"""
+
+    def __init__(self):
+        self.clicks = 0
+
+    def __call__(self, job):
+        self.clicks += 1
+
+
+def time_call(func, repeat, rounds=ROUNDS):
+    """Best over `rounds` of the mean seconds per call of `func`
+
+    The minimum is the run least disturbed by the rest of the machine, so it
+    is far more stable between runs than the mean or median.
+    """
+    func()  # warm up
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        samples.append((time.perf_counter() - start) / repeat)
+    return min(samples)
+
+
+def repeat_for(width, height, quick):
+    """Fewer repeats for big regions so every case takes a similar time"""
+    repeat = max(10, 2_000_000 // (width * height))
+    return max(1, repeat // 10) if quick else repeat
+
+
+def make_pair(width, height):
+    """Reference image and a live frame that differs in one pixel"""
+    reference = Image.effect_noise((width, height), 64).convert('RGB')
+    live = reference.copy()
+    live.putpixel((width // 2, height // 2), (255, 0, 0))
+    return reference, live
+
+
+def bench_compare(quick):
+    """MouseClicker.compare_images with RGB, RGBA and resized live frames"""
+    results = {}
+    for width, height in SIZES:
+        reference, live = make_pair(width, height)
+        # compare_images only needs these two attributes, no Tk window
+        app = types.SimpleNamespace(captured_image=reference, compare_engine=CompareEngine(reference))
+        cases = {
+            'rgb': live,
+            'rgba': live.convert('RGBA'),
+            'resize': live.resize((width + width // 10, height + height // 10)),
+        }
+        repeat = repeat_for(width, height, quick)
+        for mode, frame in cases.items():
+            seconds = time_call(lambda f=frame: MouseClicker.compare_images(app, reference, f), repeat)
+            results[f'compare_images.{mode}.{width}x{height}'] = (seconds * 1000, 'ms', 'lower')
+    return results
+
+
+def bench_preview(quick):
+    """render_preview (the PIL half of update_preview), plain and with a mask"""
+    results = {}
+    for width, height in PREVIEW_SIZES:
+        image, _ = make_pair(width, height)
+        ignore = rect_mask((height, width), [(0, 0, width // 4, height // 4)])
+        repeat = max(2, repeat_for(width, height, quick) // 4)
+        for mode, mask in (('plain', None), ('masked', ignore)):
+            seconds = time_call(lambda m=mask: render_preview(image, m), repeat)
+            results[f'update_preview.{mode}.{width}x{height}'] = (seconds * 1000, 'ms', 'lower')
+    return results
+
+
+def bench_scheduler_tick(quick):
+    """Scheduler bookkeeping per tick: no capture, no-op click"""
+    clock = FakeClock()
+    clicker = FakeInput()
+    scheduler = Scheduler(FakeBackend([Image.new('RGB', (8, 8))]), clicker=clicker, clock=clock)
+    for i in range(50):
+        scheduler.add_job(ClickJob(f"job{i}", i, i, interval=1 + i % 7))
+    ticks = 5_000 if quick else 50_000
+
+    def run():
+        done = 0
+        while done < ticks:
+            clock.now = scheduler.next_due()
+            done += scheduler.run_pending()
+        return done
+
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        done = run()
+        per_tick = (time.perf_counter() - start) / done
+        best = per_tick if best is None else min(best, per_tick)
+    return {'scheduler.tick_overhead': (best * 1e6, 'us', 'lower')}
+
+
+def bench_end_to_end(quick):
+    """Ticks per second through capture -> compare -> click for one monitored region"""
+    results = {}
+    screen = Image.effect_noise((1920, 1080), 64).convert('RGB')
+    ticks = E2E_TICKS  # Cheap, and short runs are too noisy to compare
+    for name, region, threshold in (('button', (760, 620, 200, 60), 95),
+                                    ('panel', (400, 200, 640, 480), 95),
+                                    ('exact', (760, 620, 200, 60), 100)):
+        left, top, width, height = region
+        reference = screen.crop((left, top, left + width, top + height))
+        clock = FakeClock()
+        clicker = FakeInput()
+        scheduler = Scheduler(FakeBackend([screen]), clicker=clicker, clock=clock)
+        scheduler.add_job(ClickJob(name, left, top, region, reference, interval=1, threshold=threshold))
+        best = None
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            for _ in range(ticks):
+                clock.now = scheduler.next_due()
+                scheduler.run_pending()
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        assert clicker.clicks == ticks * ROUNDS, "fake screen should always match"
+        results[f'end_to_end.{name}.ticks_per_second'] = (ticks / best, 'ticks/s', 'higher')
+    return results
+
+
+BENCHMARKS = [bench_compare, bench_preview, bench_scheduler_tick, bench_end_to_end]
+
+
+def run_suite(quick=False):
+    """Run every benchmark; return the JSON-serialisable results document"""
+    results = {}
+    for bench in BENCHMARKS:
+        for name, (value, unit, better) in bench(quick).items():
+            results[name] = {'value': round(value, 6), 'unit': unit, 'better': better}
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pillow': Image.__version__,
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Return [(name, baseline value, current value, relative change)] of regressions"""
+    regressions = []
+    for name, entry in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or not base['value']:
+            continue
+        change = (entry['value'] - base['value']) / base['value']
+        if entry['better'] == 'higher':
+            change = -change
+        if change > tolerance:
+            regressions.append((name, base['value'], entry['value'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="wMouseClicker benchmark suite")
+    parser.add_argument('--output', help="write results JSON to this file")
+    parser.add_argument('--baseline', default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown per metric (default 0.30)")
+    parser.add_argument('--quick', action='store_true', help="fewer repeats, for a smoke run")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.quick)
+    for name, entry in current['results'].items():
+        print(f"{name:<45} {entry['value']:>14.4f} {entry['unit']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline; run with --save-baseline first")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.tolerance)
+    for name, base, value, change in regressions:
+        print(f"REGRESSION {name}: {base:.4f} -> {value:.4f} ({change:+.0%})")
+    if not regressions:
+        print(f"No regressions against {os.path.relpath(args.baseline)} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
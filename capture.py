@@ -0,0 +1,176 @@
+"""
+Screen capture backends for wMouseClicker.
+Every screenshot in the app goes through a CaptureBackend so the fastest
+grabber available on the host can be used, and a fake one in headless runs.
+"""
+
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+class CaptureBackend:
+    """Base class for screen capture backends"""
+
+    name = "base"
+
+    def __init__(self):
+        self.calls = 0  # Number of grabs, for benchmarks and instrumentation
+
+    def grab(self, region=None):
+        """Return a PIL Image of `region` (left, top, width, height) or the full screen"""
+        raise NotImplementedError
+
+    def grab_array(self, region=None):
+        """Return `region` as a (height, width, 3) uint8 RGB array"""
+        image = self.grab(region)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return np.asarray(image)
+
+    def grab_into(self, region, out):
+        """Capture `region` into the preallocated RGB array `out` and return it"""
+        np.copyto(out, self.grab_array(region))
+        return out
+
+    def close(self):
+        """Release any native resources"""
+
+
+class PyAutoGUIBackend(CaptureBackend):
+    """Capture through pyautogui.screenshot (PIL based, works everywhere)"""
+
+    name = "pyautogui"
+
+    def __init__(self):
+        super().__init__()
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self, region=None):
+        self.calls += 1
+        if region is None:
+            return self._pyautogui.screenshot()
+        return self._pyautogui.screenshot(region=tuple(region))
+
+
+class MSSBackend(CaptureBackend):
+    """Capture through mss, reading the raw BGRA buffer without a PIL round trip"""
+
+    name = "mss"
+
+    def __init__(self):
+        super().__init__()
+        import mss
+        self._mss = mss
+        # mss handles are bound to the thread that created them
+        self._local = threading.local()
+
+    def _handle(self):
+        handle = getattr(self._local, 'handle', None)
+        if handle is None:
+            handle = self._mss.mss()
+            self._local.handle = handle
+        return handle
+
+    def _shot(self, region):
+        handle = self._handle()
+        if region is None:
+            monitor = handle.monitors[1]  # Primary monitor, same as pyautogui
+        else:
+            left, top, width, height = region
+            monitor = {'left': left, 'top': top, 'width': width, 'height': height}
+        self.calls += 1
+        return handle.grab(monitor)
+
+    def grab_bgra(self, region=None):
+        """Return the raw (height, width, 4) BGRA array as captured"""
+        shot = self._shot(region)
+        return np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def grab(self, region=None):
+        shot = self._shot(region)
+        return Image.frombytes('RGB', shot.size, shot.bgra, 'raw', 'BGRX')
+
+    def grab_array(self, region=None):
+        # BGRA -> RGB as a strided view, no copy
+        return self.grab_bgra(region)[:, :, 2::-1]
+
+    def grab_into(self, region, out):
+        # Channel swap happens during the copy into `out`
+        np.copyto(out, self.grab_bgra(region)[:, :, 2::-1])
+        return out
+
+    def close(self):
+        handle = getattr(self._local, 'handle', None)
+        if handle is not None:
+            handle.close()
+            self._local.handle = None
+
+
+class FakeBackend(CaptureBackend):
+    """Deterministic in-memory backend that replays frames (images or file paths)"""
+
+    name = "fake"
+
+    def __init__(self, frames, loop=True):
+        super().__init__()
+        self.frames = [Image.open(f).convert('RGB') if isinstance(f, str) else f.convert('RGB')
+                       for f in frames]
+        if not self.frames:
+            raise ValueError("FakeBackend needs at least one frame")
+        self.arrays = [np.asarray(frame) for frame in self.frames]
+        self.loop = loop
+        self.index = 0
+
+    def current_frame(self):
+        """The frame the next grab will read from"""
+        return self.frames[self.index]
+
+    def advance(self):
+        """Move to the next frame (stays on the last one when not looping)"""
+        if self.index + 1 < len(self.frames):
+            self.index += 1
+        elif self.loop:
+            self.index = 0
+
+    def grab(self, region=None):
+        self.calls += 1
+        frame = self.current_frame()
+        self.advance()
+        if region is None:
+            return frame.copy()
+        left, top, width, height = region
+        return frame.crop((left, top, left + width, top + height))
+
+    def grab_array(self, region=None):
+        self.calls += 1
+        array = self.arrays[self.index]
+        self.advance()
+        if region is None:
+            return array
+        left, top, width, height = region
+        return array[top:top + height, left:left + width]
+
+    def grab_into(self, region, out):
+        np.copyto(out, self.grab_array(region))
+        return out
+
+
+BACKENDS = {
+    'mss': MSSBackend,
+    'pyautogui': PyAutoGUIBackend,
+}
+
+
+def get_backend(name='auto'):
+    """Create a capture backend by name; 'auto' picks the fastest one available"""
+    if name != 'auto':
+        return BACKENDS[name]()
+    for candidate in ('mss', 'pyautogui'):
+        try:
+            return BACKENDS[candidate]()
+        except ImportError:
+            continue
+    raise RuntimeError("No screen capture backend available (install mss or pyautogui)")
@@ -0,0 +1,209 @@
+"""
+wMouseClicker headless mode.
+Loads click jobs from a JSON file and runs the capture/compare/click loop
+with the same core as the GUI (ClickJob, Scheduler, capture backends),
+without Tkinter.
+
+Usage: python clicker_cli.py jobs.json [--backend auto|mss|pyautogui] [--duration SECONDS]
+                              [--engine threads|async] [--compare-workers N]
+                              [--metrics-log FILE] [--metrics-port PORT] [--record-frames FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+
+from PIL import Image
+
+import metrics
+import recording
+from backoff import DEFAULT_JITTER, DEFAULT_SETTLE, BackoffPolicy, OutcomeDetector
+from capture import get_backend
+from image_compare import rect_mask
+from macro import load_macro
+from scheduler import ClickJob, Scheduler
+from profiles import load_profile
+
+
+def read_job_file(path):
+    """Read a JSON job definition file"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_jobs(data, base_dir, backend=None):
+    """Create ClickJobs from a job definition
+
+    Reference, profile and macro paths are relative to `base_dir`. A job given as
+    {"profile": "name.wmcp"} is loaded from that profile file. A job without a
+    "reference" image is given one captured from its region now. A "macro"
+    file recorded with macro.py replaces the job's click and rest click. A
+    "backoff" object gives the job an adaptive interval (see build_policy).
+    """
+    jobs = []
+    for index, spec in enumerate(data.get('jobs', [])):
+        if spec.get('profile'):
+            job, _, _ = load_profile(os.path.join(base_dir, spec['profile']))
+            jobs.append(job)
+            continue
+        name = spec.get('name', f"job{index + 1}")
+        x, y = spec['click']
+        region = spec.get('region')
+        reference = None
+        if spec.get('reference'):
+            reference = Image.open(os.path.join(base_dir, spec['reference'])).convert('RGB')
+        elif region is not None and backend is not None:
+            reference = backend.grab(tuple(region)).convert('RGB')
+        macro = load_macro(os.path.join(base_dir, spec['macro'])) if spec.get('macro') else None
+        job = ClickJob(
+            name, x, y,
+            region=region,
+            reference=reference,
+            rest_position=spec.get('rest'),
+            interval=spec.get('interval', 300),
+            interval_max=spec.get('interval_max'),
+            click_type=spec.get('click_type', 'left'),
+            threshold=spec.get('threshold', 100),
+            safety=spec.get('safety', True),
+            search_margin=spec.get('search_margin', 0),
+            fidelity=spec.get('fidelity'),
+            macro=macro,
+        )
+        if spec.get('backoff'):
+            job.policy = build_policy(spec['backoff'], job, base_dir)
+        if spec.get('ignore') and job.engine is not None:
+            job.engine.set_mask(rect_mask(job.engine.ref_array.shape, spec['ignore']))
+        if spec.get('incremental') and job.engine is not None:
+            job.engine.set_incremental(True)
+        jobs.append(job)
+    return jobs
+
+
+def build_policy(spec, job, base_dir):
+    """BackoffPolicy for `job` from its "backoff" object
+
+    "success" and "failure" are reference images of the screen after a click
+    (relative to `base_dir`), compared over "region" (default: the job's
+    region). The job's interval is the starting interval.
+    """
+    detector = None
+    if spec.get('success') or spec.get('failure'):
+        states = {state: Image.open(os.path.join(base_dir, spec[state])).convert('RGB')
+                  for state in ('success', 'failure') if spec.get(state)}
+        detector = OutcomeDetector(spec.get('region', job.region), threshold=spec.get('threshold', 95),
+                                   settle=spec.get('settle', DEFAULT_SETTLE), **states)
+    return BackoffPolicy(job.interval, spec.get('min'), spec.get('max', job.interval_max),
+                         factors=spec.get('factors'), jitter=spec.get('jitter', DEFAULT_JITTER),
+                         detector=detector, stop_on_success=spec.get('stop_on_success', True),
+                         max_attempts=spec.get('max_attempts'))
+
+
+def print_tick(job, result, did_click):
+    """Default on_tick: one line per attempt"""
+    action = "Clicked" if did_click else "Skipped"
+    line = f"{job.name}: {action} | Clicks: {job.click_count} | Skipped: {job.skipped_count}"
+    if result is not None:
+        line += f" | UI Match: {result.similarity:.1f}%"
+    print(line, flush=True)
+
+
+def print_outcome(job, outcome):
+    """Default on_outcome: what a backoff policy saw after the click"""
+    policy = job.policy
+    line = f"{job.name}: Outcome {outcome} | Attempts: {policy.attempts}"
+    line += " | Stopped" if policy.stopped else f" | Next: ~{policy.current:.0f}s"
+    print(line, flush=True)
+
+
+def run_async(args, settings, backend, jobs, tick_metrics, recorder):
+    """Run `jobs` on the AsyncEngine until --duration elapses, every job finishes, or Ctrl+C"""
+    import asyncio
+
+    from async_engine import AsyncEngine
+
+    engine = AsyncEngine(backend, on_tick=None if args.quiet else print_tick, metrics=tick_metrics,
+                         on_outcome=None if args.quiet else print_outcome, recorder=recorder)
+    for job in jobs:
+        engine.add_job(job, delay=job.interval if settings.get('delay_first', False) else 0)
+    try:
+        asyncio.run(engine.run(args.duration))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        backend.close()
+        tick_metrics.close()
+        if recorder is not None:
+            recorder.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run wMouseClicker jobs without the GUI")
+    parser.add_argument('job_file', help="JSON file with a \"jobs\" list")
+    parser.add_argument('--backend', default=None, help="capture backend (auto, mss, pyautogui)")
+    parser.add_argument('--duration', type=float, default=None, help="stop after this many seconds")
+    parser.add_argument('--quiet', action='store_true', help="do not print every tick")
+    parser.add_argument('--engine', choices=('threads', 'async'), default='threads',
+                        help="timer thread scheduler, or one coroutine per job on asyncio")
+    parser.add_argument('--compare-workers', type=int, default=None,
+                        help="compare regions that are due together in this many worker processes")
+    metrics.add_arguments(parser)
+    recording.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    settings = read_job_file(args.job_file)
+    backend = get_backend(args.backend or settings.get('capture_backend', 'auto'))
+    jobs = build_jobs(settings, os.path.dirname(os.path.abspath(args.job_file)), backend)
+    if not jobs:
+        print("No jobs defined", file=sys.stderr)
+        return 1
+
+    tick_metrics = metrics.from_arguments(args)
+    recorder = recording.from_arguments(args)
+    if args.engine == 'async':
+        return run_async(args, settings, backend, jobs, tick_metrics, recorder)
+    pool = None
+    workers = args.compare_workers or settings.get('compare_workers', 0)
+    if workers:
+        from compare_pool import ComparePool
+        pool = ComparePool(workers)
+    def on_tick(job, result, did_click):
+        if not args.quiet:
+            print_tick(job, result, did_click)
+        if not scheduler.jobs:
+            scheduler.stop()  # Every job's policy ran out of attempts
+
+    def on_outcome(job, outcome):
+        if not args.quiet:
+            print_outcome(job, outcome)
+        if not scheduler.jobs:
+            scheduler.stop()  # Every job succeeded or ran out of attempts
+
+    scheduler = Scheduler(backend, on_tick=on_tick, batch_window=settings.get('batch_window', 0.0),
+                          metrics=tick_metrics, pool=pool, on_outcome=on_outcome, recorder=recorder)
+    for job in jobs:
+        scheduler.add_job(job, delay=job.interval if settings.get('delay_first', False) else 0)
+
+    if args.duration is not None:
+        stopper = threading.Timer(args.duration, scheduler.stop)
+        stopper.daemon = True
+        stopper.start()
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pool is not None:
+            pool.close()
+        backend.close()
+        tick_metrics.close()
+        if recorder is not None:
+            recorder.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
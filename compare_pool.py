@@ -0,0 +1,161 @@
+"""
+Process-pool comparison for wMouseClicker.
+When many large regions are due at once, their compares run in worker
+processes instead of one after another on the scheduler thread. Pixels never
+go through pickle: each job gets one shared-memory block holding its
+reference, its live frame and its ignore mask. Captures are written straight
+into the shared live frame, and workers attach to the block by name. A task
+is just (block spec, threshold) and the reply is the small TileCheck.
+
+Workers run the same CompareEngine.decide() on the same bytes, so results are
+identical to the single-process path.
+"""
+
+import collections
+import concurrent.futures
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from image_compare import CompareEngine
+
+# Spec of one job's shared block: everything a worker needs to attach to it
+SlotSpec = collections.namedtuple('SlotSpec', 'name shape has_mask fidelity margin incremental',
+                                  defaults=(False,))
+
+WORKER_CACHE = 64  # Attached blocks kept open per worker process
+
+
+def _attach(name):
+    """Open an existing block without registering it for cleanup in this process"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers it again, with the tracker workers share with
+        # the parent; that is a no-op and the parent's unlink() unregisters it
+        return shared_memory.SharedMemory(name=name)
+
+
+def _views(buffer, shape, has_mask):
+    """(reference, live, ignore) arrays laid out back to back in `buffer`"""
+    nbytes = int(np.prod(shape))
+    reference = np.ndarray(shape, dtype=np.uint8, buffer=buffer)
+    live = np.ndarray(shape, dtype=np.uint8, buffer=buffer, offset=nbytes)
+    ignore = None
+    if has_mask:
+        ignore = np.ndarray(shape[:2], dtype=bool, buffer=buffer, offset=2 * nbytes)
+    return reference, live, ignore
+
+
+def _block_size(shape, has_mask):
+    nbytes = int(np.prod(shape))
+    return 2 * nbytes + (shape[0] * shape[1] if has_mask else 0)
+
+
+# Worker process state: block name -> (SharedMemory, CompareEngine), oldest first
+_attached = collections.OrderedDict()
+
+
+def _worker_decide(spec, threshold):
+    """Worker side: decide() on the shared live frame; return (TileCheck, seconds)"""
+    entry = _attached.get(spec.name)
+    if entry is None:
+        shm = _attach(spec.name)
+        reference, live, ignore = _views(shm.buf, tuple(spec.shape), spec.has_mask)
+        engine = CompareEngine(reference, fidelity=spec.fidelity, margin=spec.margin, incremental=spec.incremental)
+        engine.live = live  # Masking then fills ignored pixels in place
+        if ignore is not None:
+            engine.set_mask(ignore)
+        entry = _attached[spec.name] = (shm, engine)
+        while len(_attached) > WORKER_CACHE:
+            _, (old_shm, _) = _attached.popitem(last=False)
+            old_shm.close()
+    else:
+        _attached.move_to_end(spec.name)
+    engine = entry[1]
+    start = time.perf_counter()
+    result = engine.decide(engine.live, threshold)
+    return result, time.perf_counter() - start
+
+
+def _slot_key(engine):
+    # The engine itself, not its id(): the key keeps it alive, so a replacement cannot reuse the address
+    return engine, engine.version
+
+
+class _Slot:
+    """Parent side of one job's shared block"""
+
+    def __init__(self, engine):
+        shape = engine.ref_array.shape
+        has_mask = engine.ignore is not None
+        self.shm = shared_memory.SharedMemory(create=True, size=_block_size(shape, has_mask))
+        reference, self.live, ignore = _views(self.shm.buf, shape, has_mask)
+        np.copyto(reference, engine.ref_array)
+        if has_mask:
+            np.copyto(ignore, engine.ignore)
+        self.spec = SlotSpec(self.shm.name, shape, has_mask, engine.fidelity, engine.margin, engine.incremental)
+        # Re-register when the job's engine is replaced or its mask, fidelity or mode changes
+        self.key = _slot_key(engine)
+
+    def close(self):
+        self.live = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ComparePool:
+    """Runs ClickJob compares in worker processes over shared memory"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = {}  # job -> _Slot
+
+    def _slot(self, job):
+        slot = self._slots.get(job)
+        if slot is None or slot.key != _slot_key(job.engine):
+            if slot is not None:
+                slot.close()
+            slot = self._slots[job] = _Slot(job.engine)
+        return slot
+
+    def submit(self, job, backend, frame=None):
+        """Capture `job`'s region into shared memory and start its compare
+
+        Returns a Future of (TileCheck, compare seconds), or None when the job
+        is not compared in the pool (no capture needed, or search mode).
+        `frame` is an already captured view of the region (batched grab).
+        """
+        if not job.needs_capture() or job.search_margin > 0:
+            return None
+        slot = self._slot(job)
+        job.capture_time = job.compare_time = None
+        try:
+            if frame is None:
+                start = time.perf_counter()
+                backend.grab_into(job.region, slot.live)
+                job.capture_time = time.perf_counter() - start
+            else:
+                np.copyto(slot.live, job.engine.as_array(frame))
+            job.last_frame = slot.live
+        except Exception as exc:
+            future = concurrent.futures.Future()
+            future.set_exception(exc)
+            return future
+        return self._executor.submit(_worker_decide, slot.spec, job.threshold)
+
+    def release(self, job):
+        """Free the shared block of a job that is no longer scheduled"""
+        slot = self._slots.pop(job, None)
+        if slot is not None:
+            slot.close()
+
+    def close(self):
+        """Stop the workers and free every shared block"""
+        self._executor.shutdown(wait=True)
+        for slot in self._slots.values():
+            slot.close()
+        self._slots.clear()
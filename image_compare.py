@@ -0,0 +1,421 @@
+"""
+Image comparison engine for wMouseClicker.
+Stores the captured reference once as a contiguous uint8 array and compares
+live captures against it with vectorized numpy operations.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+
+def pil_similarity(img1, img2):
+    """Compare two images with PIL and return similarity percentage (0-100)"""
+    from PIL import ImageChops, ImageStat
+
+    if img1 is None or img2 is None:
+        return 0
+
+    # Ensure same size
+    if img1.size != img2.size:
+        img2 = img2.resize(img1.size, Image.Resampling.LANCZOS)
+
+    # Convert to same mode
+    img1 = img1.convert('RGB')
+    img2 = img2.convert('RGB')
+
+    # Calculate difference
+    diff = ImageChops.difference(img1, img2)
+    stat = ImageStat.Stat(diff)
+
+    # Calculate similarity (inverse of mean difference)
+    mean_diff = sum(stat.mean) / 3
+    similarity = max(0, 100 - (mean_diff / 255 * 100))
+
+    return similarity
+
+
+# Result of a banded threshold check (see CompareEngine.bands). `similarity` is
+# exact when every band was examined, otherwise it is the bound that decided the outcome.
+# `level` names the reduced-fidelity level that decided, if any (see FidelityLevel).
+TileCheck = namedtuple('TileCheck', 'matched similarity exact tiles_examined tiles_total level',
+                       defaults=(None,))
+
+# check() walks at most MAX_BANDS full-width row bands of at least
+# MIN_BAND_BYTES each, so a frame that never exits early costs about one flat diff
+MAX_BANDS = 16
+MIN_BAND_BYTES = 64 * 1024
+# Reduced-fidelity similarity this close to the threshold escalates to full RGB
+ESCALATE_MARGIN = 2.0
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+# Side in pixels of the blocks an incremental compare re-diffs (see set_incremental)
+BLOCK = 32
+
+
+def to_rgb_array(image, size=None):
+    """Convert a PIL image to a contiguous (height, width, 3) uint8 array"""
+    # Resize in the original mode first, same order as pil_similarity
+    if size is not None and image.size != size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.ascontiguousarray(np.asarray(image, dtype=np.uint8))
+
+
+def similarity_from_diff(total_diff, count):
+    """Turn a summed absolute difference over `count` samples into a percentage"""
+    if count == 0:
+        return 0
+    mean_diff = total_diff / count
+    return max(0, 100 - (mean_diff / 255 * 100))
+
+
+def parse_fidelity(fidelity):
+    """Downscale factors of a fidelity spec, coarsest first
+
+    'rgb' is full resolution only, 'gray' a grayscale level, 'gray/N' a
+    grayscale level downscaled by N; levels can be chained coarse to fine,
+    e.g. 'gray/8,gray/2'. Full RGB always remains the last resort.
+    """
+    factors = []
+    for part in (fidelity or 'rgb').split(','):
+        part = part.strip().lower()
+        if part in ('', 'rgb'):
+            continue
+        mode, _, factor = part.partition('/')
+        if mode != 'gray' or (factor and not factor.isdigit()) or factor == '0':
+            raise ValueError(f"Unknown fidelity level {part!r} (use rgb, gray or gray/N)")
+        factors.append(int(factor or 1))
+    return factors
+
+
+class FidelityLevel:
+    """Grayscale reference sampled every `factor` pixels, plus a scratch buffer
+
+    Downscaling samples the frame instead of averaging it, so a level only
+    reads 1/factor**2 of the pixels; anything aliasing hides is caught by
+    escalating when the result is near the threshold.
+    """
+
+    def __init__(self, reference, factor, ignore=None):
+        self.factor = factor
+        self.name = f"gray/{factor}" if factor > 1 else "gray"
+        self.gray = np.empty(reference[::factor, ::factor].shape[:2], dtype=np.float32)
+        self.reference = self.sample(reference).copy()
+        # Ignored pixels hold reference values after prepare(), so only compared samples count
+        if ignore is None:
+            self.count = self.gray.size
+        else:
+            self.count = int((~ignore[::factor, ::factor]).sum())
+
+    def sample(self, array):
+        """Grayscale of every `factor`-th pixel of an RGB array, in the scratch buffer"""
+        if self.factor == 1:
+            return np.matmul(array, GRAY_WEIGHTS, out=self.gray)
+        view = array[::self.factor, ::self.factor]
+        np.multiply(view[..., 0], GRAY_WEIGHTS[0], out=self.gray)
+        self.gray += view[..., 1] * GRAY_WEIGHTS[1]
+        self.gray += view[..., 2] * GRAY_WEIGHTS[2]
+        return self.gray
+
+    def similarity(self, live):
+        """Approximate similarity (0-100) of `live` at this level"""
+        diff = self.sample(live)
+        np.subtract(diff, self.reference, out=diff)
+        np.abs(diff, out=diff)
+        return similarity_from_diff(float(diff.sum(dtype=np.float64)), self.count)
+
+
+def diff_budget(threshold, count):
+    """Largest summed absolute difference that still reaches `threshold` percent"""
+    # similarity >= threshold  <=>  total_diff <= (100 - threshold) / 100 * 255 * count
+    budget = (100 - float(threshold)) / 100 * 255 * count
+    return max(0.0, budget)
+
+
+class CompareEngine:
+    """Compares live captures against a reference held as a uint8 array"""
+
+    def __init__(self, reference, fidelity='rgb', margin=ESCALATE_MARGIN, incremental=False):
+        # `reference` is a PIL Image or an RGB uint8 array (possibly memory-mapped)
+        if isinstance(reference, np.ndarray):
+            self.reference = None
+            self.ref_array = reference
+        else:
+            self.reference = reference
+            self.ref_array = to_rgb_array(reference)
+        self.size = (self.ref_array.shape[1], self.ref_array.shape[0])
+        # Capture buffer for this region, filled in place by CaptureBackend.grab_into
+        self.live = np.empty_like(self.ref_array)
+        # Scratch buffers reused on every compare (max/min trick keeps uint8)
+        self._hi = np.empty_like(self.ref_array)
+        self._lo = np.empty_like(self.ref_array)
+        self._bands = {}
+        # Ignored pixels (blinking cursors, clocks, spinners); see set_mask
+        self.ignore = None
+        self._ignore3 = None
+        self.compare_count = self.ref_array.size
+        # Bumped by set_mask, set_fidelity and set_incremental, so copies (compare_pool) can tell
+        self.version = 0
+        # Reduced-fidelity levels tried before the full RGB compare; see set_fidelity
+        self.fidelity = 'rgb'
+        self.margin = margin
+        self._levels = []
+        self.set_fidelity(fidelity, margin)
+        self.set_incremental(incremental)
+
+    def set_fidelity(self, fidelity, margin=None):
+        """Precompute the reference pyramid for `fidelity` (see parse_fidelity)"""
+        factors = parse_fidelity(fidelity)
+        self.version += 1
+        self.fidelity = fidelity or 'rgb'
+        if margin is not None:
+            self.margin = margin
+        self._levels = [FidelityLevel(self.ref_array, factor, self.ignore) for factor in factors]
+
+    def set_incremental(self, enabled=True):
+        """Decide from the last frame's cached per-block diffs (see incremental_check)"""
+        self.version += 1
+        self.incremental = enabled
+        self._last = None  # Copy of the last prepared frame, once one was compared
+        self._block_diffs = None  # Summed absolute difference of each BLOCK x BLOCK block
+        self._changed = None  # Scratch for live != last
+        self._total = 0
+
+    def set_mask(self, ignore):
+        """Exclude pixels where `ignore` (height x width bool array) is True from every compare"""
+        self.version += 1
+        self._bands.clear()
+        self._last = None  # Cached block diffs were taken with the old mask
+        if ignore is None or not np.any(ignore):
+            self.ignore = None
+            self._ignore3 = None
+            self.compare_count = self.ref_array.size
+        else:
+            ignore = np.asarray(ignore, dtype=bool)
+            if ignore.shape != self.ref_array.shape[:2]:
+                raise ValueError("Mask size does not match the reference")
+            self.ignore = ignore
+            self._ignore3 = np.broadcast_to(ignore[:, :, None], self.ref_array.shape)
+            self.compare_count = int((~ignore).sum()) * 3
+        if self._levels:
+            self.set_fidelity(self.fidelity)
+
+    def as_array(self, image):
+        """Return `image` as an RGB array matching the reference size"""
+        if isinstance(image, np.ndarray):
+            if image.shape == self.ref_array.shape:
+                return image
+            image = Image.fromarray(np.ascontiguousarray(image[:, :, :3]))
+        return to_rgb_array(image, self.size)
+
+    def prepare(self, image):
+        """as_array(), then overwrite ignored pixels with the reference so they never differ"""
+        live = self.as_array(image)
+        if self.ignore is None:
+            return live
+        if live is not self.live:
+            # Never write into a caller's frame (it may be a shared batched grab)
+            np.copyto(self.live, live)
+            live = self.live
+        np.copyto(live, self.ref_array, where=self._ignore3)
+        return live
+
+    def bands(self, count=None):
+        """(top, bottom, compared bytes) of the row bands covering the region, cached per count
+
+        Full-width bands are contiguous, so each is diffed in one pass. By
+        default there is one band per MIN_BAND_BYTES, at most MAX_BANDS: small
+        regions get a single band and large ones a few. Bands that are entirely
+        ignored are left out, so they are never diffed.
+        """
+        if count is None:
+            count = min(MAX_BANDS, max(1, self.ref_array.nbytes // MIN_BAND_BYTES))
+        bands = self._bands.get(count)
+        if bands is None:
+            height = self.ref_array.shape[0]
+            step = -(-height // count)
+            bands = []
+            for top in range(0, height, step):
+                if self.ignore is None:
+                    compared = self.ref_array[top:top + step].size
+                else:
+                    compared = int((~self.ignore[top:top + step]).sum()) * 3
+                if compared:
+                    bands.append((top, top + step, compared))
+            self._bands[count] = bands
+        return bands
+
+    def total_diff(self, image):
+        """Sum of absolute per-channel differences against the reference"""
+        live = self.prepare(image)
+        np.maximum(self.ref_array, live, out=self._hi)
+        np.minimum(self.ref_array, live, out=self._lo)
+        np.subtract(self._hi, self._lo, out=self._hi)
+        return int(self._hi.sum(dtype=np.uint64))
+
+    def similarity(self, image):
+        """Return similarity percentage (0-100), same value as pil_similarity"""
+        if image is None:
+            return 0
+        return similarity_from_diff(self.total_diff(image), self.compare_count)
+
+    def exceeds_threshold(self, image, threshold):
+        """Return True if `image` differs from the reference more than `threshold` allows"""
+        if image is None:
+            return True
+        return self.total_diff(image) > diff_budget(threshold, self.compare_count)
+
+    def check(self, image, threshold, bands=None):
+        """Walk the region in row bands and stop once the threshold decision is certain"""
+        if image is None:
+            return TileCheck(False, 0, True, 0, 0)
+        return self._check(self.prepare(image), threshold, bands)
+
+    def _check(self, live, threshold, bands=None):
+        count = self.compare_count
+        budget = diff_budget(threshold, count)
+        bands = self.bands(bands)
+
+        total = 0
+        remaining = count
+        for examined, (top, bottom, band_count) in enumerate(bands, 1):
+            ref = self.ref_array[top:bottom]
+            hi = self._hi[top:bottom]
+            lo = self._lo[top:bottom]
+            cur = live[top:bottom]
+            np.maximum(ref, cur, out=hi)
+            np.minimum(ref, cur, out=lo)
+            np.subtract(hi, lo, out=hi)
+            total += int(hi.sum(dtype=np.uint64))
+            remaining -= band_count
+
+            if remaining == 0:
+                break
+            # Cannot reach the threshold any more, even if the rest is identical
+            if total > budget:
+                return TileCheck(False, similarity_from_diff(total, count), False,
+                                 examined, len(bands))
+            # Cannot drop below the threshold, even if the rest differs completely
+            if total + 255 * remaining <= budget:
+                return TileCheck(True, similarity_from_diff(total + 255 * remaining, count), False,
+                                 examined, len(bands))
+
+        return TileCheck(total <= budget, similarity_from_diff(total, count), True,
+                         len(bands), len(bands))
+
+    def _rediff(self, live, top, bottom, left, right):
+        """Recompute the cached diffs of the blocks covering rows top:bottom, columns left:right"""
+        ref = self.ref_array[top:bottom, left:right]
+        hi = self._hi[top:bottom, left:right]
+        lo = self._lo[top:bottom, left:right]
+        np.maximum(ref, live[top:bottom, left:right], out=hi)
+        np.minimum(ref, live[top:bottom, left:right], out=lo)
+        np.subtract(hi, lo, out=hi)
+        # Sum the rows of each band first (whole rows at a time, the fast axis for
+        # numpy), then each block's columns. A band column sums to at most
+        # 255 * 32, which fits uint16; a block to 765 * 1024, which fits uint32
+        rows, row_bytes = bottom - top, (right - left) * 3
+        full = rows - rows % BLOCK
+        bands = hi[:full].reshape(full // BLOCK, BLOCK, row_bytes).sum(axis=1, dtype=np.uint16)
+        if full < rows:
+            bands = np.vstack([bands, hi[full:].reshape(rows - full, row_bytes).sum(axis=0, dtype=np.uint16)])
+        self._block_diffs[top // BLOCK:-(-bottom // BLOCK), left // BLOCK:-(-right // BLOCK)] = \
+            np.add.reduceat(bands, np.arange(0, row_bytes, BLOCK * 3), axis=1, dtype=np.uint32)
+        np.copyto(self._last[top:bottom, left:right], live[top:bottom, left:right])
+
+    def incremental_check(self, image, threshold):
+        """Exact threshold check that only re-diffs blocks changed since the last frame
+
+        The last compared frame is kept with the summed difference of every
+        block. A new frame is compared with that copy (a plain equality test,
+        far cheaper than the diff), and only the blocks that changed are
+        diffed against the reference again. An unchanged frame costs a single
+        comparison pass. The similarity is always exact, the same as
+        similarity(); tiles_examined counts the re-diffed blocks.
+        """
+        if image is None:
+            return TileCheck(False, 0, True, 0, 0)
+        live = self.prepare(image)
+        height, width = self.ref_array.shape[:2]
+        if self._last is None:
+            self._last = np.empty_like(self.ref_array)
+            self._changed = np.empty(self.ref_array.shape, dtype=bool)
+            self._block_diffs = np.zeros((-(-height // BLOCK), -(-width // BLOCK)), dtype=np.int64)
+            self._rediff(live, 0, height, 0, width)
+            examined = self._block_diffs.size
+        else:
+            changed = np.not_equal(live, self._last, out=self._changed)
+            examined = 0
+            if changed.any():
+                bands = np.unique(np.flatnonzero(changed.reshape(height, -1).any(axis=1)) // BLOCK)
+                if len(bands) * 2 > self._block_diffs.shape[0]:
+                    # Most of the frame changed: one pass is cheaper than many slices
+                    self._rediff(live, 0, height, 0, width)
+                    examined = self._block_diffs.size
+                else:
+                    for band in bands:
+                        top, bottom = band * BLOCK, min(height, band * BLOCK + BLOCK)
+                        columns = np.flatnonzero(changed[top:bottom].reshape(bottom - top, -1).any(axis=0)) // 3
+                        left = columns[0] // BLOCK * BLOCK
+                        right = min(width, (columns[-1] // BLOCK + 1) * BLOCK)
+                        self._rediff(live, top, bottom, left, right)
+                        examined += -(-(right - left) // BLOCK)
+        if examined:
+            self._total = int(self._block_diffs.sum())
+        budget = diff_budget(threshold, self.compare_count)
+        return TileCheck(self._total <= budget, similarity_from_diff(self._total, self.compare_count), True,
+                         examined, self._block_diffs.size)
+
+    def decide(self, image, threshold):
+        """Fidelity levels, then check(): only close calls get the full RGB diff
+
+        With reduced-fidelity levels, each level decides unless its similarity
+        is within `margin` of the threshold; then the next finer level runs.
+        An incremental engine decides every frame exactly with incremental_check() instead.
+        """
+        if image is None:
+            return TileCheck(False, 0, True, 0, 0)
+        if self.incremental:
+            return self.incremental_check(image, threshold)
+        live = self.prepare(image)
+        for level in self._levels:
+            similarity = level.similarity(live)
+            if abs(similarity - float(threshold)) > self.margin:
+                return TileCheck(similarity >= float(threshold), similarity, False, 0, 0, level.name)
+        return self._check(live, threshold)
+
+
+def learn_mask(frames, tolerance=0, grow=1):
+    """Ignore mask of pixels that vary across several captures of the same UI
+
+    `frames` are RGB arrays or PIL images of one region. A pixel is ignored if
+    any channel varies by more than `tolerance`; the mask is grown by `grow`
+    pixels to cover anti-aliased edges of the moving content.
+    """
+    arrays = [frame if isinstance(frame, np.ndarray) else to_rgb_array(frame) for frame in frames]
+    if len(arrays) < 2:
+        raise ValueError("Need at least two frames to learn a mask")
+    low = arrays[0].copy()
+    high = arrays[0].copy()
+    for array in arrays[1:]:
+        np.minimum(low, array, out=low)
+        np.maximum(high, array, out=high)
+    ignore = ((high - low) > tolerance).any(axis=2)
+    for _ in range(grow):
+        grown = ignore.copy()
+        grown[1:, :] |= ignore[:-1, :]
+        grown[:-1, :] |= ignore[1:, :]
+        grown[:, 1:] |= ignore[:, :-1]
+        grown[:, :-1] |= ignore[:, 1:]
+        ignore = grown
+    return ignore
+
+
+def rect_mask(shape, rects):
+    """Ignore mask from (left, top, width, height) rectangles relative to the region"""
+    ignore = np.zeros(shape[:2], dtype=bool)
+    for left, top, width, height in rects:
+        ignore[max(0, top):top + height, max(0, left):left + width] = True
+    return ignore
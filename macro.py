@@ -0,0 +1,435 @@
+"""
+Recorded input macros for wMouseClicker.
+A Macro is a list of Steps (move, click, key, type, wait), each issued a
+fixed delay after the previous one and optionally guarded by a region that
+must still match its reference. A MacroPlayer replays it on an absolute
+schedule through an InputBackend: steps with no delay between them go out
+back to back as one batch, and waits end on a short spin instead of a
+scheduler-sized sleep, so there is no fixed pause between input calls.
+A MacroRecorder builds macros from global hotkeys.
+
+Usage: python macro.py record macro.json [--guard WxH] [--max-gap SECONDS]
+       python macro.py play macro.json [--repeat N] [--speed X]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from PIL import Image
+
+from image_compare import CompareEngine
+from scheduler import DeadlineTimer, load_pyautogui
+
+ACTIONS = ('move', 'click', 'key', 'type', 'wait')
+CLICK_TYPES = {'left': ('left', 1), 'right': ('right', 1), 'double': ('left', 2)}
+REST_DELAY = 0.05  # Seconds between a job's click and its rest click
+SPIN = 0.002  # Seconds before a deadline the player stops sleeping and spins
+
+# `delay` is the number of seconds after the previous step this one is issued
+Step = namedtuple('Step', 'action x y button clicks keys text delay guard',
+                  defaults=(None, None, 'left', 1, (), '', 0.0, None))
+# The step only runs while `region` still matches `engine`'s reference
+Guard = namedtuple('Guard', 'region engine threshold', defaults=(100,))
+# lateness holds one value per batch: seconds between its deadline and sending it
+PlaybackResult = namedtuple('PlaybackResult', 'completed steps_run aborted_at guard_result lateness')
+
+
+class Macro:
+    """Named sequence of Steps"""
+
+    def __init__(self, steps, name="macro"):
+        self.name = name
+        self.steps = list(steps)
+        for step in self.steps:
+            if step.action not in ACTIONS:
+                raise ValueError(f"Unknown macro action: {step.action!r}")
+
+    def __len__(self):
+        return len(self.steps)
+
+    @property
+    def duration(self):
+        """Scheduled seconds from the first step to the last"""
+        return sum(step.delay for step in self.steps)
+
+    def shifted(self, dx, dy):
+        """Copy with every point and guard region moved by (dx, dy), e.g. after search mode followed the target"""
+        if not dx and not dy:
+            return self
+        steps = []
+        for step in self.steps:
+            if step.x is not None:
+                step = step._replace(x=step.x + dx, y=step.y + dy)
+            if step.guard is not None:
+                left, top, width, height = step.guard.region
+                step = step._replace(guard=step.guard._replace(region=(left + dx, top + dy, width, height)))
+            steps.append(step)
+        return Macro(steps, self.name)
+
+    def batches(self):
+        """Split the steps into runs sent back to back
+
+        A batch starts at every step with a delay or a guard, since those
+        have to wait for their deadline or check the screen first.
+        """
+        batches = []
+        for step in self.steps:
+            if not batches or step.delay > 0 or step.guard is not None:
+                batches.append([])
+            batches[-1].append(step)
+        return batches
+
+    def save(self, path):
+        """Write the macro as JSON, guard references as PNGs next to it"""
+        base_dir = os.path.dirname(os.path.abspath(path))
+        stem = os.path.splitext(os.path.basename(path))[0]
+        steps = []
+        for index, step in enumerate(self.steps):
+            spec = {'action': step.action, 'delay': round(step.delay, 4)}
+            if step.action in ('move', 'click') and step.x is not None:
+                spec['at'] = [step.x, step.y]
+            if step.action == 'click':
+                spec['button'] = step.button
+                spec['clicks'] = step.clicks
+            elif step.action == 'key':
+                spec['keys'] = list(step.keys)
+            elif step.action == 'type':
+                spec['text'] = step.text
+            if step.guard is not None:
+                reference = f"{stem}_guard{index + 1}.png"
+                Image.fromarray(step.guard.engine.ref_array).save(os.path.join(base_dir, reference))
+                spec['guard'] = {'region': list(step.guard.region), 'reference': reference,
+                                 'threshold': step.guard.threshold}
+            steps.append(spec)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'name': self.name, 'steps': steps}, f, indent=2)
+
+
+def step_from_spec(spec, base_dir):
+    """Build a Step from its JSON form (guard references relative to base_dir)"""
+    guard = None
+    if spec.get('guard'):
+        reference = Image.open(os.path.join(base_dir, spec['guard']['reference'])).convert('RGB')
+        guard = Guard(tuple(spec['guard']['region']), CompareEngine(reference),
+                      spec['guard'].get('threshold', 100))
+    x, y = spec.get('at', (None, None))
+    return Step(spec['action'], x, y, spec.get('button', 'left'), spec.get('clicks', 1),
+                tuple(spec.get('keys', ())), spec.get('text', ''), spec.get('delay', 0.0), guard)
+
+
+def load_macro(path):
+    """Read a macro written by Macro.save"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    return Macro([step_from_spec(spec, base_dir) for spec in data.get('steps', [])],
+                 data.get('name', os.path.splitext(os.path.basename(path))[0]))
+
+
+def click_macro(job):
+    """The classic single action of a ClickJob: its click, then the rest click"""
+    button, clicks = CLICK_TYPES.get(job.click_type, ('left', 1))
+    steps = [Step('click', job.x, job.y, button, clicks)]
+    if job.rest_position is not None:
+        steps.append(Step('click', *job.rest_position, delay=REST_DELAY))
+    return Macro(steps, job.name)
+
+
+class InputBackend:
+    """Base class for input backends (real mouse/keyboard or a fake)"""
+
+    name = "base"
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def click(self, x=None, y=None, button='left', clicks=1):
+        """Click `clicks` times at (x, y), or where the pointer is"""
+        raise NotImplementedError
+
+    def press(self, keys):
+        """Press a key, or a combination such as ('ctrl', 's')"""
+        raise NotImplementedError
+
+    def write(self, text):
+        raise NotImplementedError
+
+    def send(self, steps):
+        """Issue a batch of steps back to back"""
+        for step in steps:
+            if step.action == 'move':
+                self.move(step.x, step.y)
+            elif step.action == 'click':
+                self.click(step.x, step.y, step.button, step.clicks)
+            elif step.action == 'key':
+                self.press(step.keys)
+            elif step.action == 'type':
+                self.write(step.text)
+
+
+class PyAutoGUIInput(InputBackend):
+    """Real input through pyautogui, with its per-call pause turned off"""
+
+    name = "pyautogui"
+
+    def __init__(self):
+        self._pyautogui = load_pyautogui()
+
+    def move(self, x, y):
+        self._pyautogui.moveTo(x, y, _pause=False)
+
+    def click(self, x=None, y=None, button='left', clicks=1):
+        self._pyautogui.click(x, y, clicks=clicks, button=button, _pause=False)
+
+    def press(self, keys):
+        if len(keys) == 1:
+            self._pyautogui.press(keys[0], _pause=False)
+        else:
+            self._pyautogui.hotkey(*keys, _pause=False)
+
+    def write(self, text):
+        self._pyautogui.write(text, _pause=False)
+
+
+class FakeInput(InputBackend):
+    """Records (time, action, args) instead of touching the mouse or keyboard"""
+
+    name = "fake"
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = []
+        self.batches = 0
+
+    def send(self, steps):
+        self.batches += 1
+        super().send(steps)
+
+    def move(self, x, y):
+        self.events.append((self.clock(), 'move', (x, y)))
+
+    def click(self, x=None, y=None, button='left', clicks=1):
+        self.events.append((self.clock(), 'click', (x, y, button, clicks)))
+
+    def press(self, keys):
+        self.events.append((self.clock(), 'key', tuple(keys)))
+
+    def write(self, text):
+        self.events.append((self.clock(), 'type', (text,)))
+
+
+class MacroPlayer:
+    """Replays Macros on an absolute schedule through an InputBackend
+
+    With a FakeClock, pass DeadlineTimer(clock, clock.wait) and spin=0: the
+    fake wait jumps straight to each deadline and events land exactly on it.
+    """
+
+    def __init__(self, input_backend=None, capture_backend=None, timer=None, spin=SPIN):
+        self._input = input_backend
+        self.capture_backend = capture_backend  # Only needed for guarded steps
+        self.timer = timer or DeadlineTimer(clock=time.perf_counter)
+        self.spin = spin
+
+    @property
+    def input(self):
+        """Input backend, pyautogui unless one was given"""
+        if self._input is None:
+            self._input = PyAutoGUIInput()
+        return self._input
+
+    def stop(self):
+        """Abort a playback in progress at its next wait"""
+        self.timer.stop()
+
+    def wait_until(self, deadline):
+        """Sleep to just before `deadline`, then spin; False if stopped"""
+        clock = self.timer.clock
+        if deadline - self.spin > clock() and not self.timer.wait_until(deadline - self.spin):
+            return False
+        while clock() < deadline:
+            pass
+        return not self.timer.stopped
+
+    def check_guard(self, guard, capture_backend=None):
+        """TileCheck of the guard's region against its reference"""
+        backend = capture_backend or self.capture_backend
+        if backend is None:
+            raise ValueError("Guarded macro steps need a capture backend")
+        frame = backend.grab_into(guard.region, guard.engine.live)
+        return guard.engine.decide(frame, guard.threshold)
+
+    def play(self, macro, speed=1.0, capture_backend=None):
+        """Run every step of `macro`; stop early if a guard fails or stop() is called
+
+        `speed` divides every delay (2.0 plays twice as fast). Guards capture
+        through `capture_backend` when given, else the player's own.
+        """
+        self.timer.reset()
+        clock = self.timer.clock
+        deadline = clock()
+        lateness = []
+        steps_run = 0
+        for batch in macro.batches():
+            deadline += batch[0].delay / speed
+            if not self.wait_until(deadline):
+                return PlaybackResult(False, steps_run, steps_run, None, lateness)
+            guard = batch[0].guard
+            if guard is not None:
+                result = self.check_guard(guard, capture_backend)
+                if not result.matched:
+                    return PlaybackResult(False, steps_run, steps_run, result, lateness)
+            lateness.append(max(0.0, clock() - deadline))
+            self.input.send(batch)
+            steps_run += len(batch)
+        return PlaybackResult(True, steps_run, None, None, lateness)
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def default_player():
+    """Shared player on the real mouse, used by scheduler.click_job
+
+    It has no capture backend of its own: click_job passes the one the job's
+    checks use, so guards see the same grabber and no second one is opened.
+    """
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = MacroPlayer()
+        return _player
+
+
+class MacroRecorder:
+    """Builds a Macro from global hotkeys while the user works normally
+
+    F9 clicks at the pointer (Shift+F9 right click, Ctrl+F9 double click) and
+    records it; other keys pressed are recorded as key steps; Esc finishes.
+    The time between recorded events becomes each step's delay. With
+    `guard_size`, the area around each click is captured just before it and
+    becomes that step's guard.
+    """
+
+    HOTKEYS = {'f9': ('left', 1), 'shift+f9': ('right', 1), 'ctrl+f9': ('left', 2)}
+    MODIFIERS = ('ctrl', 'alt', 'shift', 'windows')
+
+    def __init__(self, capture_backend=None, guard_size=None, threshold=100, max_gap=None,
+                 clock=time.perf_counter):
+        self.capture_backend = capture_backend
+        self.guard_size = guard_size  # (width, height) or None
+        self.threshold = threshold
+        self.max_gap = max_gap  # Longest delay kept between steps, in seconds
+        self.clock = clock
+        self.steps = []
+        self._last = None
+        self._lock = threading.Lock()
+        self.done = threading.Event()
+
+    def add(self, action, **fields):
+        """Append a step, delayed by the time since the previous one"""
+        with self._lock:
+            now = self.clock()
+            delay = 0.0 if self._last is None else now - self._last
+            if self.max_gap is not None:
+                delay = min(delay, self.max_gap)
+            self._last = now
+            self.steps.append(Step(action, delay=delay, **fields))
+
+    def guard_at(self, x, y):
+        """Guard over guard_size pixels centred on (x, y), captured now"""
+        if self.guard_size is None or self.capture_backend is None:
+            return None
+        width, height = self.guard_size
+        region = (max(0, x - width // 2), max(0, y - height // 2), width, height)
+        reference = self.capture_backend.grab(region).convert('RGB')
+        return Guard(region, CompareEngine(reference), self.threshold)
+
+    def record_click(self, button, clicks):
+        pyautogui = load_pyautogui()
+        x, y = pyautogui.position()
+        guard = self.guard_at(x, y)
+        self.add('click', x=x, y=y, button=button, clicks=clicks, guard=guard)
+        pyautogui.click(x, y, clicks=clicks, button=button, _pause=False)
+
+    def on_key(self, event, keyboard):
+        name = event.name
+        if name in self.MODIFIERS or name == 'f9' or name.startswith(('left ', 'right ')):
+            return  # Modifiers only count as part of a combination
+        if name == 'esc':
+            self.done.set()
+            return
+        held = tuple(m for m in self.MODIFIERS if keyboard.is_pressed(m))
+        self.add('key', keys=held + (name,))
+
+    def record(self, name="macro"):
+        """Record until Esc; return the Macro"""
+        import keyboard
+
+        for hotkey, (button, clicks) in self.HOTKEYS.items():
+            keyboard.add_hotkey(hotkey, self.record_click, args=(button, clicks))
+        keyboard.on_press(lambda event: self.on_key(event, keyboard))
+        try:
+            self.done.wait()
+        finally:
+            keyboard.unhook_all()
+        return Macro(self.steps, name)
+
+
+def parse_size(text):
+    """'120x40' -> (120, 40)"""
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay a wMouseClicker macro")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="record clicks (F9) and keys until Esc")
+    record.add_argument('macro_file')
+    record.add_argument('--guard', type=parse_size, default=None,
+                        help="guard each click with a WxH area around it")
+    record.add_argument('--threshold', type=float, default=100, help="guard match threshold (%%)")
+    record.add_argument('--max-gap', type=float, default=None, help="cap recorded delays at this many seconds")
+    play = commands.add_parser('play', help="replay a recorded macro")
+    play.add_argument('macro_file')
+    play.add_argument('--repeat', type=int, default=1)
+    play.add_argument('--speed', type=float, default=1.0, help="delay divisor (2 = twice as fast)")
+    args = parser.parse_args(argv)
+
+    from capture import get_backend
+
+    backend = get_backend()
+    try:
+        if args.command == 'record':
+            print("F9 click, Shift+F9 right click, Ctrl+F9 double click, Esc to finish", flush=True)
+            name = os.path.splitext(os.path.basename(args.macro_file))[0]
+            macro = MacroRecorder(backend, args.guard, args.threshold, args.max_gap).record(name)
+            macro.save(args.macro_file)
+            print(f"Saved {len(macro)} steps ({macro.duration:.2f} s) to {args.macro_file}")
+            return 0
+        macro = load_macro(args.macro_file)
+        player = MacroPlayer(capture_backend=backend)
+        for run in range(args.repeat):
+            result = player.play(macro, args.speed)
+            late = max(result.lateness, default=0.0)
+            print(f"Run {run + 1}: {result.steps_run}/{len(macro)} steps, max lateness {late * 1000:.2f} ms",
+                  flush=True)
+            if result.guard_result is not None:
+                print(f"Stopped before step {result.aborted_at + 1}: guard did not match", file=sys.stderr)
+                return 1
+        return 0
+    except KeyboardInterrupt:
+        return 1
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Per-tick metrics for wMouseClicker.
+Records capture, compare and click latency, scheduling lateness, similarity
+and the decision for every tick as in-process counters and histograms. They
+can be streamed to a JSON-lines log and served as Prometheus text on a local
+port. When disabled, callers only pay for an `if metrics.enabled` check, and
+recording never blocks the click loop (log lines go through a queue to a
+writer thread).
+"""
+
+import json
+import queue
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIMILARITY_BUCKETS = (50, 80, 90, 95, 98, 99, 99.5, 99.9, 100)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name):
+        """Prometheus exposition lines for this histogram"""
+        lines = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {running}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum {self.sum}')
+        lines.append(f'{name}_count {self.count}')
+        return lines
+
+
+class Metrics:
+    """Counters and histograms for capture -> compare -> click ticks"""
+
+    def __init__(self, enabled=True, log_path=None):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.counters = {'ticks': 0, 'clicks': 0, 'skips': 0, 'capture_errors': 0}
+        self.histograms = {
+            'capture_seconds': Histogram(LATENCY_BUCKETS),
+            'compare_seconds': Histogram(LATENCY_BUCKETS),
+            'click_seconds': Histogram(LATENCY_BUCKETS),
+            'lateness_seconds': Histogram(LATENCY_BUCKETS),
+            'similarity_percent': Histogram(SIMILARITY_BUCKETS),
+        }
+        self._queue = None
+        self._writer = None
+        if enabled and log_path:
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_log, args=(log_path,), daemon=True)
+            self._writer.start()
+
+    def record_tick(self, job, capture=None, compare=None, click=None, lateness=None,
+                    similarity=None, decision=None, error=False):
+        """Record one tick; durations in seconds, decision is 'click' or 'skip'"""
+        with self._lock:
+            self.counters['ticks'] += 1
+            if decision == 'click':
+                self.counters['clicks'] += 1
+            elif decision == 'skip':
+                self.counters['skips'] += 1
+            if error:
+                self.counters['capture_errors'] += 1
+            for name, value in (('capture_seconds', capture), ('compare_seconds', compare),
+                                ('click_seconds', click), ('lateness_seconds', lateness),
+                                ('similarity_percent', similarity)):
+                if value is not None:
+                    self.histograms[name].observe(value)
+        if self._queue is not None:
+            self._queue.put({'ts': time.time(), 'job': job, 'capture': capture, 'compare': compare,
+                             'click': click, 'lateness': lateness, 'similarity': similarity,
+                             'decision': decision, 'error': error})
+
+    def observe(self, name, value):
+        """Add one value to a histogram outside of a tick (e.g. a shared batched grab)"""
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def _write_log(self, path):
+        """Writer thread: drain queued ticks into a JSON-lines file"""
+        with open(path, 'a', encoding='utf-8') as f:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                f.write(json.dumps(record) + '\n')
+                if self._queue.empty():
+                    f.flush()
+
+    def close(self):
+        """Flush and stop the log writer"""
+        if self._queue is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._queue = None
+
+    def snapshot(self):
+        """Copy of the counters and histogram (count, sum) pairs"""
+        with self._lock:
+            data = dict(self.counters)
+            for name, hist in self.histograms.items():
+                data[name] = {'count': hist.count, 'sum': hist.sum}
+            return data
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+            for name, value in self.counters.items():
+                lines.append(f'# TYPE wmc_{name}_total counter')
+                lines.append(f'wmc_{name}_total {value}')
+            for name, hist in self.histograms.items():
+                lines.append(f'# TYPE wmc_{name} histogram')
+                lines.extend(hist.lines(f'wmc_{name}'))
+        return '\n'.join(lines) + '\n'
+
+
+# Shared disabled instance: `if metrics.enabled` is the only cost
+NULL_METRICS = Metrics(enabled=False)
+
+
+def serve_metrics(metrics, port, host='127.0.0.1'):
+    """Serve metrics.prometheus_text() at http://host:port/metrics on a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') not in ('', '/metrics'):
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scrapes out of stderr
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser):
+    """Add --metrics-log / --metrics-port options to an argparse parser"""
+    parser.add_argument('--metrics-log', default=None, help="append per-tick metrics to this JSON-lines file")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="serve Prometheus text metrics on this local port")
+
+
+def from_arguments(args):
+    """Create Metrics (and the endpoint) from parsed add_arguments options"""
+    if not args.metrics_log and args.metrics_port is None:
+        return NULL_METRICS
+    metrics = Metrics(log_path=args.metrics_log)
+    if args.metrics_port is not None:
+        serve_metrics(metrics, args.metrics_port)
+    return metrics
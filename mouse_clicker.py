@@ -5,25 +5,76 @@ With UI safety check - only clicks if the target UI hasn't changed.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pyautogui
-import threading
+from tkinter import ttk, messagebox, filedialog
+import argparse
+import math
 import time
-import keyboard
-import random
-from PIL import Image, ImageTk, ImageChops, ImageStat, ImageDraw
+import os
+import numpy as np
+from PIL import Image, ImageTk
+from image_compare import CompareEngine, pil_similarity, learn_mask, rect_mask
+from capture import get_backend
+from scheduler import ClickJob, DeadlineTimer, Scheduler, click_job
+from watch import Watcher
+from backoff import BackoffPolicy, OutcomeDetector
+from ui_channel import UIChannel
+import profiles
+import metrics as metrics_module
+import recording
 
-# Disable pyautogui fail-safe for flexibility (be careful!)
-pyautogui.FAILSAFE = True  # Move mouse to corner to abort
-pyautogui.PAUSE = 0.1
+# pyautogui, keyboard and the capture backend are imported on first use
+# (see scheduler.load_pyautogui, setup_hotkeys and capture.get_backend)
+
+REFRESH_MS = 100  # Fixed UI refresh: worker updates and the pointer are shown at this rate
+OVERLAY_MAX_PIXELS = 1920 * 1080  # Larger screens get a sampled, zoomed overlay background
+
+
+def overlay_background(frame, max_pixels=OVERLAY_MAX_PIXELS):
+    """Darkened overlay background from a full-screen RGB array
+
+    Returns (PIL image, scale): the screen sampled every `scale` pixels so at
+    most `max_pixels` go through PhotoImage conversion. Halving the brightness
+    replaces a full-screen stippled rectangle, which is slow to redraw.
+    """
+    height, width = frame.shape[:2]
+    scale = 1
+    while (height // scale) * (width // scale) > max_pixels:
+        scale += 1
+    return Image.fromarray(frame[::scale, ::scale] >> 1), scale
+
+
+def render_preview(image, ignore=None, max_size=(380, 100)):
+    """Scale `image` into the preview box, tint ignored pixels and add a border
+
+    Returns (bordered PIL image, scale ratio). Kept free of Tk so it can be
+    benchmarked headless.
+    """
+    img = image
+    # Tint ignored pixels so the mask is visible
+    if ignore is not None:
+        mask = Image.fromarray(ignore).convert('L')
+        tinted = Image.blend(img.convert('RGB'), Image.new('RGB', img.size, '#e94560'), 0.6)
+        img = Image.composite(tinted, img.convert('RGB'), mask)
+    
+    # Calculate scaling to fit within preview while maintaining aspect ratio
+    max_width, max_height = max_size
+    ratio = min(max_width / img.width, max_height / img.height)
+    new_size = (int(img.width * ratio), int(img.height * ratio))
+    img = img.resize(new_size, Image.Resampling.LANCZOS)
+    
+    # Add a subtle border to the preview image
+    bordered = Image.new('RGB', (img.width + 4, img.height + 4), '#0f3460')
+    bordered.paste(img, (2, 2))
+    return bordered, ratio
 
 
 class ScreenSelector:
     """Fullscreen overlay for selecting click position, monitoring region, and rest position"""
     
-    def __init__(self, callback):
+    def __init__(self, callback, capture_backend):
         self.callback = callback
-        self.screenshot = None
+        self.capture_backend = capture_backend
+        self.frame = None  # Full-screen RGB array; only the selected rectangle is ever converted
         self.click_x = None
         self.click_y = None
         self.rest_x = None
@@ -33,11 +84,17 @@ class ScreenSelector:
         self.rect_id = None
         self.region_data = None  # Store region data temporarily
         self.step = 1  # Step 1: click position, Step 2: draw rectangle, Step 3: rest position
+        self.size_text = None
+        # Measured overlay open time and per-drag-event cost, in seconds
+        self.open_seconds = None
+        self.drag_events = 0
+        self.drag_seconds = 0.0
         
     def start_selection(self):
         """Show the selection overlay"""
-        # Take a screenshot first (before showing overlay)
-        self.screenshot = pyautogui.screenshot()
+        start = time.perf_counter()
+        # Take a screenshot first (before showing overlay), kept as a raw array
+        self.frame = self.capture_backend.grab_array()
         
         # Create fullscreen window
         self.overlay = tk.Toplevel()
@@ -54,14 +111,17 @@ class ScreenSelector:
                                 highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
         
-        # Display screenshot with dark overlay
-        self.bg_image = ImageTk.PhotoImage(self.screenshot)
+        # Display the darkened screenshot; big screens are converted sampled and zoomed back up by Tk
+        background, scale = overlay_background(self.frame)
+        self._bg_small = ImageTk.PhotoImage(background)
+        if scale == 1:
+            self.bg_image = self._bg_small
+        else:
+            self.bg_image = tk.PhotoImage(master=self.overlay, width=background.width * scale,
+                                          height=background.height * scale)
+            self.bg_image.tk.call(self.bg_image, 'copy', self._bg_small, '-zoom', scale, scale)
         self.canvas.create_image(0, 0, anchor=tk.NW, image=self.bg_image)
         
-        # Add semi-transparent dark overlay
-        self.canvas.create_rectangle(0, 0, self.screen_width, self.screen_height, 
-                                      fill='black', stipple='gray50', tags='overlay')
-        
         # Instructions text
         self.instruction_text = self.canvas.create_text(
             self.screen_width // 2, 30, 
@@ -76,6 +136,8 @@ class ScreenSelector:
         
         # Focus the overlay
         self.overlay.focus_force()
+        self.overlay.update_idletasks()
+        self.open_seconds = time.perf_counter() - start
         
     def on_click(self, event):
         """Handle mouse click"""
@@ -122,6 +184,11 @@ class ScreenSelector:
                 self.rect_start_x, self.rect_start_y,
                 outline='#00d9ff', width=2, tags='selection'
             )
+            # Size label, moved and relabelled in place while dragging
+            self.size_text = self.canvas.create_text(
+                self.rect_start_x, self.rect_start_y, text="",
+                fill='#00d9ff', font=('Segoe UI', 12, 'bold'), tags='sizetext'
+            )
             
         elif self.step == 3:
             # Step 3: Record rest position (where to move mouse after clicking)
@@ -143,30 +210,29 @@ class ScreenSelector:
             )
             
             # Complete - close overlay and call callback
-            left, top, width, height, captured_image = self.region_data
+            left, top, width, height, captured_image, compare_engine = self.region_data
             self.overlay.destroy()
+            self.frame = None
             self.callback(self.click_x, self.click_y, left, top, width, height, 
-                         captured_image, self.rest_x, self.rest_y)
+                         captured_image, self.rest_x, self.rest_y, compare_engine)
         
     def on_drag(self, event):
         """Handle mouse drag"""
         if self.step == 2 and self.rect_id:
+            start = time.perf_counter()
             # Update rectangle
             self.canvas.coords(self.rect_id, 
                 self.rect_start_x, self.rect_start_y, event.x, event.y)
             
-            # Update size display
+            # Update size display in place
             width = abs(event.x - self.rect_start_x)
             height = abs(event.y - self.rect_start_y)
-            
-            # Delete old size text and create new
-            self.canvas.delete('sizetext')
             center_x = (self.rect_start_x + event.x) // 2
             center_y = (self.rect_start_y + event.y) // 2
-            self.canvas.create_text(center_x, center_y, 
-                                    text=f"{width} x {height}",
-                                    fill='#00d9ff', font=('Segoe UI', 12, 'bold'),
-                                    tags='sizetext')
+            self.canvas.coords(self.size_text, center_x, center_y)
+            self.canvas.itemconfig(self.size_text, text=f"{width} x {height}")
+            self.drag_events += 1
+            self.drag_seconds += time.perf_counter() - start
             
     def on_release(self, event):
         """Handle mouse button release"""
@@ -192,15 +258,19 @@ class ScreenSelector:
             self.canvas.delete('selection')
             self.canvas.delete('sizetext')
             self.rect_id = None
+            self.size_text = None
             self.rect_start_x = None
             self.rect_start_y = None
             return
             
-        # Crop the screenshot to get the captured region
-        captured_image = self.screenshot.crop((left, top, right, bottom))
+        # Convert only the selected rectangle of the screenshot, at full resolution
+        captured_image = Image.fromarray(np.ascontiguousarray(self.frame[top:bottom, left:right]))
+        
+        # Convert the reference once here so click ticks never have to
+        compare_engine = CompareEngine(captured_image)
         
         # Store region data and move to step 3
-        self.region_data = (left, top, width, height, captured_image)
+        self.region_data = (left, top, width, height, captured_image, compare_engine)
         self.step = 3
         self.canvas.itemconfig(self.instruction_text, 
             text="Step 3/3: Click where to move mouse after clicking (rest position). Press ESC to cancel.")
@@ -208,25 +278,39 @@ class ScreenSelector:
     def on_cancel(self, event):
         """Handle ESC key or cancel"""
         self.overlay.destroy()
+        self.frame = None
 
 
 class MouseClicker:
-    def __init__(self, root):
+    def __init__(self, root, capture_backend=None, metrics=None, recorder=None):
         self.root = root
+        self.metrics = metrics or metrics_module.NULL_METRICS  # Per-tick timings, see metrics.py
+        self.recorder = recorder  # recording.FrameRecorder of every tick's frame, or None
+        self._capture_backend = capture_backend  # Created on first capture
+        self._keyboard = None  # keyboard module, once hotkeys are registered
         self.root.title("wMouseClicker")
-        self.root.geometry("680x640")
+        self.root.geometry("680x720")
         self.root.resizable(False, False)
         self.root.configure(bg="#1a1a2e")
         
         # State
         self.clicking = False
-        self.click_thread = None
+        self.scheduler = None  # Scheduler running the job in interval mode
+        self.job = None  # ClickJob shared with the headless core while running
+        self.watcher = None  # Watcher while running in watch mode
         self.click_count = 0
         self.skipped_count = 0
         self.captured_image = None  # PIL Image of captured UI
+        self.compare_engine = None  # CompareEngine holding captured_image as an array
+        self.selector = None  # Last ScreenSelector (F6 overlay)
         self.captured_photo = None  # PhotoImage for display
         self.capture_region = None  # (left, top, width, height)
         self.rest_position = None  # (x, y) where to move mouse after clicking
+        self.timer = DeadlineTimer()  # Watch-mode waits; stop() wakes it immediately
+        self.ui = UIChannel()  # Worker threads post here; poll_ui repaints at REFRESH_MS
+        self._shown_pointer = None
+        self._shown_countdown = None  # Whole seconds last shown by update_countdown
+        self._job_position = None  # Click point last shown, to notice search mode following the target
         
         # Variables
         self.x_pos = tk.StringVar(value="0")
@@ -241,11 +325,18 @@ class MouseClicker:
         self.click_type = tk.StringVar(value="left")
         self.safety_enabled = tk.BooleanVar(value=True)
         self.similarity_threshold = tk.StringVar(value="100")
+        self.search_margin = tk.StringVar(value="0")
+        self.fidelity = tk.StringVar(value="rgb")
+        self.watch_enabled = tk.BooleanVar(value=False)
+        self.watch_rate = tk.StringVar(value="20")
+        self.watch_gap = tk.StringVar(value="5")
+        self.adaptive_enabled = tk.BooleanVar(value=False)
+        self.outcome_states = {}  # 'success' / 'failure' -> PIL Image of the region after a click
         
         self.setup_styles()
         self.create_widgets()
         self.setup_hotkeys()
-        self.update_mouse_position()
+        self.poll_ui()
         
     def setup_styles(self):
         style = ttk.Style()
@@ -369,6 +460,14 @@ class MouseClicker:
                                   command=self.start_capture)
         capture_btn.pack(fill=tk.X, pady=8)
         
+        # Profile buttons
+        profile_frame = ttk.Frame(main_frame)
+        profile_frame.pack(fill=tk.X)
+        ttk.Button(profile_frame, text="💾 Save Profile", command=self.save_profile).pack(
+            side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 5))
+        ttk.Button(profile_frame, text="📂 Load Profile", command=self.load_profile).pack(
+            side=tk.LEFT, expand=True, fill=tk.X, padx=(5, 0))
+        
         # Position and region info
         info_frame = ttk.Frame(main_frame)
         info_frame.pack(fill=tk.X, pady=5)
@@ -404,6 +503,21 @@ class MouseClicker:
         self.preview_canvas.create_text(190, 50, text="Press F6 to select region", 
                                          fill="#7f8c8d", font=("Segoe UI", 9))
         
+        # Drag on the preview to mark an area to ignore
+        self.preview_canvas.bind('<Button-1>', self.on_mask_press)
+        self.preview_canvas.bind('<B1-Motion>', self.on_mask_drag)
+        self.preview_canvas.bind('<ButtonRelease-1>', self.on_mask_release)
+        self.preview_geometry = None  # (image left, image top, scale) of the preview
+        self.mask_drag_start = None
+        
+        # Ignore mask controls
+        mask_frame = ttk.Frame(preview_frame)
+        mask_frame.pack(fill=tk.X)
+        ttk.Label(mask_frame, text="Ignore mask:").pack(side=tk.LEFT)
+        ttk.Button(mask_frame, text="Learn", command=self.learn_ignore_mask).pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Button(mask_frame, text="Clear", command=self.clear_ignore_mask).pack(side=tk.LEFT)
+        ttk.Label(mask_frame, text="(or drag on preview)", style="Status.TLabel").pack(side=tk.LEFT, padx=(10, 0))
+        
         # Safety check option
         safety_frame = ttk.Frame(main_frame)
         safety_frame.pack(fill=tk.X, pady=5)
@@ -413,6 +527,12 @@ class MouseClicker:
         ttk.Label(safety_frame, text="Threshold:").pack(side=tk.LEFT, padx=(10, 2))
         ttk.Entry(safety_frame, textvariable=self.similarity_threshold, width=4).pack(side=tk.LEFT)
         ttk.Label(safety_frame, text="%").pack(side=tk.LEFT)
+        ttk.Label(safety_frame, text="Follow ±").pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Entry(safety_frame, textvariable=self.search_margin, width=4).pack(side=tk.LEFT)
+        ttk.Label(safety_frame, text="px").pack(side=tk.LEFT)
+        ttk.Label(safety_frame, text="Fidelity:").pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Combobox(safety_frame, textvariable=self.fidelity, width=7, state="readonly",
+                     values=("rgb", "gray", "gray/2", "gray/4", "gray/8")).pack(side=tk.LEFT)
         
         # Interval Frame
         interval_frame = ttk.Frame(main_frame)
@@ -444,6 +564,29 @@ class MouseClicker:
         self.max_sec_label = ttk.Label(random_frame, text="sec")
         self.max_sec_label.pack(side=tk.LEFT)
         
+        # Adaptive backoff: interval follows what the region shows after each click
+        adaptive_frame = ttk.Frame(main_frame)
+        adaptive_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Checkbutton(adaptive_frame, text="Adaptive backoff", variable=self.adaptive_enabled).pack(side=tk.LEFT)
+        ttk.Button(adaptive_frame, text="Success state",
+                   command=lambda: self.capture_outcome_state('success')).pack(side=tk.LEFT, padx=(15, 5))
+        ttk.Button(adaptive_frame, text="Failure state",
+                   command=lambda: self.capture_outcome_state('failure')).pack(side=tk.LEFT)
+        self.outcome_label = ttk.Label(adaptive_frame, text="", style="Status.TLabel")
+        self.outcome_label.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Watch mode option
+        watch_frame = ttk.Frame(main_frame)
+        watch_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Checkbutton(watch_frame, text="Watch mode", variable=self.watch_enabled).pack(side=tk.LEFT)
+        ttk.Entry(watch_frame, textvariable=self.watch_rate, width=4).pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Label(watch_frame, text="Hz").pack(side=tk.LEFT)
+        ttk.Label(watch_frame, text="Min gap:").pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Entry(watch_frame, textvariable=self.watch_gap, width=4).pack(side=tk.LEFT)
+        ttk.Label(watch_frame, text="sec").pack(side=tk.LEFT)
+        
         # Click type
         type_frame = ttk.Frame(main_frame)
         type_frame.pack(fill=tk.X, pady=5)
@@ -471,17 +614,46 @@ class MouseClicker:
         self.match_label = ttk.Label(main_frame, text="", style="Status.TLabel")
         self.match_label.pack()
         
+    @property
+    def capture_backend(self):
+        """Screen capture backend, picked on first use"""
+        if self._capture_backend is None:
+            self._capture_backend = get_backend()
+        return self._capture_backend
+        
     def setup_hotkeys(self):
+        import keyboard
+        self._keyboard = keyboard
         keyboard.add_hotkey('F6', self.start_capture)
         keyboard.add_hotkey('F7', self.start_clicking)
         keyboard.add_hotkey('F8', self.stop_clicking)
         
-    def update_mouse_position(self):
-        """Update the current mouse position display"""
-        if not self.clicking:
-            x, y = pyautogui.position()
-            self.mouse_label.config(text=f"Current: ({x}, {y})")
-        self.root.after(100, self.update_mouse_position)
+    def poll_ui(self):
+        """Fixed-rate Tk refresh: apply worker updates, then the mouse position"""
+        changes = self.ui.take()
+        if changes is not None:
+            self.apply_ui_changes(changes)
+        self.update_countdown()
+        # Only track the pointer while the window is shown and focused
+        if not self.clicking and self.root.state() == 'normal' and self.root.focus_displayof() is not None:
+            x, y = self.root.winfo_pointerxy()
+            if (x, y) != self._shown_pointer:
+                self._shown_pointer = (x, y)
+                self.mouse_label.config(text=f"Current: ({x}, {y})")
+        self.root.after(REFRESH_MS, self.poll_ui)
+        
+    def apply_ui_changes(self, changes):
+        """Repaint everything posted since the last refresh in one pass"""
+        if 'moved' in changes:
+            self.on_target_moved(changes['moved'])
+        if 'match' in changes:
+            self.update_status_display(*changes['match'])
+        if 'status' in changes:
+            self.status_label.config(text=changes['status'])
+        if 'finished' in changes:
+            # The policy stopped the loop (success or out of attempts)
+            self.stop_clicking()
+            self.status_label.config(text=changes['finished'])
         
     def start_capture(self):
         """Start the screen region selection"""
@@ -494,10 +666,12 @@ class MouseClicker:
         
     def _do_capture(self):
         """Actually start the capture after window is hidden"""
-        selector = ScreenSelector(self.on_region_selected)
-        selector.start_selection()
+        # Kept so its open_seconds / drag timings can be inspected afterwards
+        self.selector = ScreenSelector(self.on_region_selected, self.capture_backend)
+        self.selector.start_selection()
         
-    def on_region_selected(self, click_x, click_y, left, top, width, height, captured_image, rest_x, rest_y):
+    def on_region_selected(self, click_x, click_y, left, top, width, height, captured_image, rest_x, rest_y,
+                           compare_engine=None):
         """Callback when region selection is complete"""
         # Show main window again
         self.root.deiconify()
@@ -508,6 +682,7 @@ class MouseClicker:
         self.y_pos.set(str(click_y))
         self.capture_region = (left, top, width, height)
         self.captured_image = captured_image
+        self.compare_engine = compare_engine or CompareEngine(captured_image)
         self.rest_position = (rest_x, rest_y)
         
         # Update region info
@@ -520,24 +695,122 @@ class MouseClicker:
         # Update status
         self.status_label.config(text=f"Status: Captured click ({click_x}, {click_y}), rest ({rest_x}, {rest_y})")
         
+    def settings_vars(self):
+        """Tk variables saved with a profile, by name"""
+        return {
+            'interval_min': self.interval_min,
+            'interval_sec': self.interval_sec,
+            'random_enabled': self.random_enabled,
+            'interval_max_min': self.interval_max_min,
+            'interval_max_sec': self.interval_max_sec,
+            'click_type': self.click_type,
+            'safety_enabled': self.safety_enabled,
+            'similarity_threshold': self.similarity_threshold,
+            'search_margin': self.search_margin,
+            'fidelity': self.fidelity,
+            'watch_enabled': self.watch_enabled,
+            'watch_rate': self.watch_rate,
+            'watch_gap': self.watch_gap,
+            'adaptive_enabled': self.adaptive_enabled,
+        }
+        
+    def build_job(self, name="gui"):
+        """Create a ClickJob from the current capture and settings"""
+        interval_max = self.get_interval_seconds(use_max=True) if self.random_enabled.get() else None
+        try:
+            threshold = float(self.similarity_threshold.get() or 95)
+        except ValueError:
+            threshold = 95
+        try:
+            search_margin = max(0, int(self.search_margin.get() or 0))
+        except ValueError:
+            search_margin = 0
+        return ClickJob(name, int(self.x_pos.get()), int(self.y_pos.get()),
+                        region=self.capture_region, reference=self.captured_image,
+                        rest_position=self.rest_position, interval=self.get_interval_seconds(),
+                        interval_max=interval_max, click_type=self.click_type.get(),
+                        threshold=threshold, safety=self.safety_enabled.get(),
+                        engine=self.compare_engine, search_margin=search_margin,
+                        fidelity=self.fidelity.get(), policy=self.build_policy(interval_max))
+        
+    def build_policy(self, interval_max=None):
+        """BackoffPolicy from the adaptive settings, or None when they are off"""
+        if not self.adaptive_enabled.get():
+            return None
+        detector = None
+        if self.outcome_states and self.capture_region is not None:
+            detector = OutcomeDetector(self.capture_region, **self.outcome_states)
+        return BackoffPolicy(self.get_interval_seconds(), max_interval=interval_max, detector=detector)
+        
+    def capture_outcome_state(self, state):
+        """Capture the region as it looks after a successful or a failed click"""
+        if self.capture_region is None or self.clicking:
+            messagebox.showwarning("Warning", "Press F6 to select region first.")
+            return
+        self.root.withdraw()
+        
+        def grab():
+            try:
+                self.outcome_states[state] = self.capture_backend.grab(self.capture_region).convert('RGB')
+            except Exception as e:
+                self.status_label.config(text=f"Status: State capture failed ({e})")
+            self.root.deiconify()
+            self.outcome_label.config(text=" + ".join(sorted(self.outcome_states)))
+            
+        # Let the window disappear so it is not in the capture
+        self.root.after(200, grab)
+        
+    def save_profile(self):
+        """Save the current capture and settings to a profile file"""
+        if self.captured_image is None:
+            messagebox.showwarning("Warning", "Nothing captured yet.\nPress F6 to select region first.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=profiles.EXTENSION,
+                                            filetypes=[("wMouseClicker profile", "*" + profiles.EXTENSION)])
+        if not path:
+            return
+        try:
+            name = os.path.splitext(os.path.basename(path))[0]
+            settings = {key: var.get() for key, var in self.settings_vars().items()}
+            profiles.save_profile(path, self.build_job(name), settings)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not save profile:\n{e}")
+            return
+        self.status_label.config(text=f"Status: Saved profile {os.path.basename(path)}")
+        
+    def load_profile(self):
+        """Load a capture and its settings from a profile file"""
+        if self.clicking:
+            return
+        path = filedialog.askopenfilename(filetypes=[("wMouseClicker profile", "*" + profiles.EXTENSION)])
+        if not path:
+            return
+        try:
+            job, settings, _ = profiles.load_profile(path, in_memory=True)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Error", f"Could not load profile:\n{e}")
+            return
+        
+        # Settings first, so the preview and status reflect the loaded profile
+        for key, var in self.settings_vars().items():
+            if key in settings:
+                var.set(settings[key])
+        self.toggle_random()
+        
+        left, top, width, height = job.region
+        rest_x, rest_y = job.rest_position
+        captured_image = Image.fromarray(job.engine.ref_array)
+        self.on_region_selected(job.x, job.y, left, top, width, height, captured_image,
+                                rest_x, rest_y, job.engine)
+        self.status_label.config(text=f"Status: Loaded profile {os.path.basename(path)}")
+        
     def update_preview(self):
         """Update the preview canvas with the captured image"""
         if self.captured_image is None or self.capture_region is None:
             return
             
-        # Resize image to fit preview (max 380x100)
-        img = self.captured_image.copy()
-        orig_width, orig_height = img.size
-        
-        # Calculate scaling to fit within preview while maintaining aspect ratio
-        max_width, max_height = 380, 100
-        ratio = min(max_width / img.width, max_height / img.height)
-        new_size = (int(img.width * ratio), int(img.height * ratio))
-        img = img.resize(new_size, Image.Resampling.LANCZOS)
-        
-        # Add a subtle border to the preview image
-        bordered = Image.new('RGB', (img.width + 4, img.height + 4), '#0f3460')
-        bordered.paste(img, (2, 2))
+        ignore = self.compare_engine.ignore if self.compare_engine is not None else None
+        bordered, ratio = render_preview(self.captured_image, ignore)
         
         # Convert to PhotoImage
         self.captured_photo = ImageTk.PhotoImage(bordered)
@@ -552,6 +825,7 @@ class MouseClicker:
         
         self.preview_canvas.create_image(canvas_center_x, canvas_center_y, 
                                           image=self.captured_photo, anchor=tk.CENTER)
+        self.preview_geometry = (img_left + 2, img_top + 2, ratio)
         
         # Calculate click position relative to preview
         click_x = int(self.x_pos.get())
@@ -577,28 +851,97 @@ class MouseClicker:
                                          preview_click_x + 5, preview_click_y + 5,
                                          outline='#e94560', width=2)
         
-    def compare_images(self, img1, img2):
-        """Compare two images and return similarity percentage (0-100)"""
-        if img1 is None or img2 is None:
-            return 0
-            
-        # Ensure same size
-        if img1.size != img2.size:
-            img2 = img2.resize(img1.size, Image.Resampling.LANCZOS)
+    def preview_to_region(self, x, y):
+        """Map a preview canvas point to pixel coordinates inside the region"""
+        img_left, img_top, ratio = self.preview_geometry
+        return int((x - img_left) / ratio), int((y - img_top) / ratio)
+        
+    def on_mask_press(self, event):
+        """Start marking an ignore rectangle on the preview"""
+        if self.compare_engine is None or self.preview_geometry is None or self.clicking:
+            return
+        self.mask_drag_start = (event.x, event.y)
+        self.preview_canvas.delete('maskrect')
+        self.preview_canvas.create_rectangle(event.x, event.y, event.x, event.y,
+                                             outline='#e94560', width=1, tags='maskrect')
+        
+    def on_mask_drag(self, event):
+        """Resize the ignore rectangle being marked"""
+        if self.mask_drag_start is None:
+            return
+        x0, y0 = self.mask_drag_start
+        self.preview_canvas.coords('maskrect', x0, y0, event.x, event.y)
+        
+    def on_mask_release(self, event):
+        """Add the marked rectangle to the ignore mask"""
+        if self.mask_drag_start is None:
+            return
+        x0, y0 = self.preview_to_region(*self.mask_drag_start)
+        x1, y1 = self.preview_to_region(event.x, event.y)
+        self.mask_drag_start = None
+        left, top = min(x0, x1), min(y0, y1)
+        width, height = abs(x1 - x0) + 1, abs(y1 - y0) + 1
+        
+        engine = self.compare_engine
+        ignore = rect_mask(engine.ref_array.shape, [(left, top, width, height)])
+        if engine.ignore is not None:
+            ignore |= engine.ignore
+        engine.set_mask(ignore)
+        self.update_preview()
+        self.update_mask_status()
+        
+    def learn_ignore_mask(self, frames=8, delay=250):
+        """Capture the region a few times and ignore the pixels that change"""
+        if self.compare_engine is None or self.capture_region is None or self.clicking:
+            messagebox.showwarning("Warning", "Press F6 to select region first.")
+            return
+        captured = [self.compare_engine.ref_array]
+        # Hidden for the whole burst: if the window overlaps the region, every
+        # pixel it covers would differ from the reference and be learned as ignored
+        self.root.withdraw()
+        
+        def grab_next():
+            try:
+                captured.append(np.array(self.capture_backend.grab_array(self.capture_region)))
+            except Exception as e:
+                self.root.deiconify()
+                self.status_label.config(text=f"Status: Mask capture failed ({e})")
+                return
+            if len(captured) <= frames:
+                self.status_label.config(text=f"Status: Learning mask {len(captured) - 1}/{frames}...")
+                self.root.after(delay, grab_next)
+                return
+            self.root.deiconify()
+            ignore = learn_mask(captured)
+            if self.compare_engine.ignore is not None:
+                ignore |= self.compare_engine.ignore
+            self.compare_engine.set_mask(ignore)
+            self.update_preview()
+            self.update_mask_status()
             
-        # Convert to same mode
-        img1 = img1.convert('RGB')
-        img2 = img2.convert('RGB')
+        # Let the window disappear before the first capture
+        self.root.after(200, grab_next)
         
-        # Calculate difference
-        diff = ImageChops.difference(img1, img2)
-        stat = ImageStat.Stat(diff)
+    def clear_ignore_mask(self):
+        """Compare every pixel again"""
+        if self.compare_engine is None or self.clicking:
+            return
+        self.compare_engine.set_mask(None)
+        self.update_preview()
+        self.update_mask_status()
         
-        # Calculate similarity (inverse of mean difference)
-        mean_diff = sum(stat.mean) / 3
-        similarity = max(0, 100 - (mean_diff / 255 * 100))
+    def update_mask_status(self):
+        """Show how much of the region is ignored"""
+        engine = self.compare_engine
+        ignored = 100 - engine.compare_count * 100 / engine.ref_array.size
+        self.status_label.config(text=f"Status: Ignoring {ignored:.1f}% of the monitored region")
         
-        return similarity
+    def compare_images(self, img1, img2):
+        """Compare two images and return similarity percentage (0-100)"""
+        # Fast path: the reference is already held as an array by the engine
+        if img1 is not None and img1 is self.captured_image and self.compare_engine is not None:
+            return self.compare_engine.similarity(img2)
+        return pil_similarity(img1, img2)
         
     def toggle_random(self):
         """Toggle random interval fields"""
@@ -622,23 +965,18 @@ class MouseClicker:
         except ValueError:
             return 0
             
-    def get_next_interval(self):
-        """Get the next interval (random if enabled, otherwise fixed)"""
-        min_interval = self.get_interval_seconds(use_max=False)
-        if self.random_enabled.get():
-            max_interval = self.get_interval_seconds(use_max=True)
-            if max_interval > min_interval:
-                return random.randint(min_interval, max_interval)
-        return min_interval
-            
     def start_clicking(self):
         """Start the periodic clicking"""
         if self.clicking:
             return
             
+        if self.watch_enabled.get():
+            self.start_watching()
+            return
+            
         try:
-            x = int(self.x_pos.get())
-            y = int(self.y_pos.get())
+            int(self.x_pos.get())
+            int(self.y_pos.get())
             min_interval = self.get_interval_seconds()
             
             if min_interval <= 0:
@@ -667,84 +1005,154 @@ class MouseClicker:
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         
-        self.click_thread = threading.Thread(target=self.click_loop, args=(x, y), daemon=True)
-        self.click_thread.start()
-        
-    def click_loop(self, x, y):
-        """Main clicking loop"""
-        while self.clicking:
-            # Check UI before clicking
-            should_click = True
-            similarity = 100
-            
-            if self.safety_enabled.get() and self.captured_image is not None and self.capture_region is not None:
-                left, top, width, height = self.capture_region
-                try:
-                    current_image = pyautogui.screenshot(region=(left, top, width, height))
-                    similarity = self.compare_images(self.captured_image, current_image)
-                    threshold = float(self.similarity_threshold.get() or 95)
-                    
-                    if similarity < threshold:
-                        should_click = False
-                        self.skipped_count += 1
-                except Exception:
-                    pass  # If screenshot fails, proceed with click
-            
-            if should_click:
-                self.perform_click(x, y)
-                self.click_count += 1
-            
-            # Update status
-            count = self.click_count
-            skipped = self.skipped_count
-            sim = similarity
-            self.root.after(0, lambda c=count, s=skipped, m=sim, dc=should_click: self.update_status_display(c, s, m, dc))
-            
-            # Get next interval (random or fixed)
-            interval = self.get_next_interval()
-            is_random = self.random_enabled.get()
+        # The GUI's job runs on the same Scheduler as headless mode
+        self.job = self.build_job()
+        self._job_position = (self.job.x, self.job.y)
+        self._shown_countdown = None
+        self.scheduler = Scheduler(self.capture_backend, clicker=lambda job: self.perform_click(),
+                                   clock=self.timer.clock, on_tick=self.on_job_tick,
+                                   on_outcome=self.on_job_outcome, metrics=self.metrics, recorder=self.recorder)
+        self.scheduler.add_job(self.job)
+        self.scheduler.start()
+        
+    def start_watching(self):
+        """Start watch mode: poll the region and click as soon as it matches"""
+        try:
+            int(self.x_pos.get())
+            int(self.y_pos.get())
+            rate = float(self.watch_rate.get())
+            min_gap = float(self.watch_gap.get() or 0)
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid numbers for position, rate and gap")
+            return
+        if rate <= 0:
+            messagebox.showerror("Error", "Please set a watch rate greater than 0")
+            return
+        if self.captured_image is None:
+            messagebox.showwarning("Warning", "Watch mode needs a captured UI.\nPress F6 to select region.")
+            return
             
-            # Countdown
-            remaining = interval
-            while remaining > 0 and self.clicking:
-                mins, secs = divmod(remaining, 60)
-                random_indicator = " (rnd)" if is_random else ""
-                c, s = self.click_count, self.skipped_count
-                self.root.after(0, lambda m=mins, sec=secs, r=random_indicator, ct=c, sk=s: self.status_label.config(
-                    text=f"Running | Clicks: {ct} | Skipped: {sk} | Next: {m:02d}:{sec:02d}{r}"
-                ))
-                time.sleep(1)
-                remaining -= 1
-                
-        self.root.after(0, lambda: self.status_label.config(text="Status: Stopped"))
+        self.clicking = True
+        self.click_count = 0
+        self.skipped_count = 0
+        self.start_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
         
-    def update_status_display(self, clicks, skipped, similarity, did_click):
+        self.timer.reset()
+        self.job = self.build_job()
+        self.job.safety = True  # Watch mode only ever clicks on a match
+        self.job.policy = None  # ... the moment it matches: there is no interval to adapt
+        self.watcher = Watcher(self.job, self.capture_backend, clicker=lambda job: self.perform_click(),
+                               rate=rate, min_gap=min_gap, timer=self.timer, on_poll=self.on_watch_poll,
+                               metrics=self.metrics, recorder=self.recorder)
+        self.watcher.start()
+        
+    def on_watch_poll(self, watcher, result, did_click):
+        """Watcher callback (worker thread): update counters and status"""
+        if not self.clicking:
+            return
+        self.click_count = self.job.click_count
+        self.skipped_count = self.job.skipped_count
+        text = f"Watching | Clicks: {self.click_count} | Polls: {watcher.polls}"
+        if watcher.latencies:
+            text += f" | Latency: {watcher.latencies[-1] * 1000:.0f} ms"
+        if did_click:
+            self.ui.post(status=text, match=(self.click_count, self.skipped_count, result.similarity, True, result))
+        else:
+            self.ui.post(status=text)
+        
+    def apply_live_settings(self, job):
+        """Settings can be changed while running: copy them onto the job for its next tick"""
+        job.safety = self.safety_enabled.get()
+        job.click_type = self.click_type.get()
+        try:
+            job.threshold = float(self.similarity_threshold.get() or 95)
+        except ValueError:
+            pass
+        if job.engine is not None and job.engine.fidelity != self.fidelity.get():
+            try:
+                job.engine.set_fidelity(self.fidelity.get())
+            except ValueError:
+                pass
+        interval = self.get_interval_seconds()
+        if interval > 0:
+            job.interval = interval
+            job.interval_max = self.get_interval_seconds(use_max=True) if self.random_enabled.get() else None
+        
+    def on_job_tick(self, job, result, did_click):
+        """Scheduler callback (timer thread): counters, status, and settings for the next tick"""
+        self.click_count = job.click_count
+        self.skipped_count = job.skipped_count
+        if (job.x, job.y) != self._job_position:
+            self._job_position = (job.x, job.y)
+            self.ui.post(moved=job)
+        similarity = result.similarity if result is not None else 100
+        self.ui.post(match=(self.click_count, self.skipped_count, similarity, did_click, result))
+        self.check_finished(job)
+        self.apply_live_settings(job)
+        
+    def on_job_outcome(self, job, outcome):
+        """Scheduler callback (timer thread): what the backoff policy saw after the click"""
+        self.ui.post(status=f"Running | Outcome: {outcome} | Attempts: {job.policy.attempts}")
+        self.check_finished(job)
+        
+    def check_finished(self, job):
+        """Stop the GUI once the job's policy stopped it (success or out of attempts)"""
+        policy = job.policy
+        if policy is not None and policy.stopped:
+            reason = "success detected" if policy.last_outcome == 'success' else "attempt limit reached"
+            self.ui.post(finished=f"Status: Stopped, {reason} | Clicks: {job.click_count} "
+                                  f"| Skipped: {job.skipped_count}")
+        
+    def update_countdown(self):
+        """Count down to the running job's next tick, once per whole second left"""
+        job = self.job
+        if self.scheduler is None or job is None or job.next_due is None:
+            return
+        remaining = max(0, math.ceil(job.next_due - self.scheduler.clock()))
+        if remaining == self._shown_countdown:
+            return
+        self._shown_countdown = remaining
+        if job.policy is not None:
+            indicator = " (adaptive)"
+        else:
+            indicator = " (rnd)" if job.interval_max is not None else ""
+        mins, secs = divmod(remaining, 60)
+        self.status_label.config(text=f"Running | Clicks: {job.click_count} | Skipped: {job.skipped_count} "
+                                      f"| Next: {mins:02d}:{secs:02d}{indicator}")
+        
+    def on_target_moved(self, job):
+        """Follow a target that search mode found at a new position"""
+        self.x_pos.set(str(job.x))
+        self.y_pos.set(str(job.y))
+        self.capture_region = job.region
+        left, top, width, height = job.region
+        self.region_info.set(f"Region: ({left}, {top}) - {width}x{height} px (followed)")
+        
+    def update_status_display(self, clicks, skipped, similarity, did_click, result=None):
         """Update the status display after a click attempt"""
         action = "Clicked" if did_click else "Skipped"
-        self.match_label.config(text=f"Last: {action} | UI Match: {similarity:.1f}%")
-        
-    def perform_click(self, x, y):
-        """Perform the actual click"""
-        click_type = self.click_type.get()
-        
-        # Move and click
-        pyautogui.moveTo(x, y)
-        
-        if click_type == "left":
-            pyautogui.click()
-        elif click_type == "right":
-            pyautogui.rightClick()
-        elif click_type == "double":
-            pyautogui.doubleClick()
+        text = f"Last: {action} | UI Match: {similarity:.1f}%"
+        if result is not None and result.level is not None:
+            text += f" | Level: {result.level}"
+        elif result is not None:
+            text += f" | Tiles: {result.tiles_examined}/{result.tiles_total}"
+        self.match_label.config(text=text)
         
-        # Click at rest position (so cursor doesn't affect UI screenshot)
-        if self.rest_position is not None:
-            rest_x, rest_y = self.rest_position
-            pyautogui.click(rest_x, rest_y)
+    def perform_click(self):
+        """Perform the actual click (same path as headless mode)"""
+        click_job(self.job, self.capture_backend)
         
     def stop_clicking(self):
         """Stop the periodic clicking"""
         self.clicking = False
+        self.timer.stop()
+        if self.scheduler is not None:
+            self.scheduler.stop(wait=False)  # Never block Tk on a click in progress
+            self.scheduler = None
+        if self.watcher is not None:
+            self.watcher.stop()  # Also puts its engine back to full compares
+            self.watcher = None
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         self.status_label.config(text=f"Status: Stopped | Clicks: {self.click_count} | Skipped: {self.skipped_count}")
@@ -752,13 +1160,26 @@ class MouseClicker:
     def on_closing(self):
         """Handle window close"""
         self.clicking = False
-        keyboard.unhook_all()
+        self.timer.stop()
+        if self.scheduler is not None:
+            self.scheduler.stop(wait=False)
+        if self._keyboard is not None:
+            self._keyboard.unhook_all()
+        if self._capture_backend is not None:
+            self._capture_backend.close()
+        self.metrics.close()
+        if self.recorder is not None:
+            self.recorder.close()
         self.root.destroy()
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="wMouseClicker")
+    metrics_module.add_arguments(parser)
+    recording.add_arguments(parser)
+    args = parser.parse_args(argv)
     root = tk.Tk()
-    app = MouseClicker(root)
+    app = MouseClicker(root, metrics=metrics_module.from_arguments(args), recorder=recording.from_arguments(args))
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
 
@@ -0,0 +1,144 @@
+"""
+Persisted capture profiles for wMouseClicker.
+A profile stores the click point, monitored region, rest position and
+settings, plus the reference pixels as raw arrays in one file that is
+memory-mapped on load (no PNG decoding). The ignore mask is stored in the
+same file. Fidelity levels are rebuilt from the
+reference on load: they are cheap to compute and must use the same luma
+weights as the live frames.
+
+File layout (.wmcp):
+    b'WMCP' | uint32 header length | JSON header | padding | raw arrays
+The header lists every array as {"dtype", "shape", "offset"} from file start.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from image_compare import CompareEngine
+from scheduler import ClickJob
+
+MAGIC = b'WMCP'
+VERSION = 1
+ALIGN = 64
+EXTENSION = '.wmcp'
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_profile(path, job, settings=None):
+    """Write `job` (click point, region, rest, reference) and `settings` to `path`"""
+    if job.engine is None:
+        raise ValueError("Profile needs a captured reference image")
+    reference = np.ascontiguousarray(job.engine.ref_array)
+    arrays = {'reference': reference}
+    if job.engine.ignore is not None:
+        arrays['ignore'] = job.engine.ignore.astype(np.uint8)
+
+    header = {
+        'version': VERSION,
+        'name': job.name,
+        'click': [job.x, job.y],
+        'region': list(job.region) if job.region is not None else None,
+        'rest': list(job.rest_position) if job.rest_position is not None else None,
+        'interval': job.interval,
+        'interval_max': job.interval_max,
+        'click_type': job.click_type,
+        'threshold': job.threshold,
+        'safety': job.safety,
+        'search_margin': job.search_margin,
+        'fidelity': job.engine.fidelity,
+        'settings': settings or {},
+        'arrays': {},
+    }
+    # Array offsets depend on the header length, which depends on the offsets
+    table = {name: {'dtype': str(a.dtype), 'shape': list(a.shape), 'offset': 0}
+             for name, a in arrays.items()}
+    header['arrays'] = table
+    header_bytes = b''
+    data_start = 0
+    while 8 + len(header_bytes) > data_start:
+        data_start = _align(8 + len(json.dumps(header).encode('utf-8')))
+        offset = data_start
+        for name, array in arrays.items():
+            table[name]['offset'] = offset
+            offset = _align(offset + array.nbytes)
+        header_bytes = json.dumps(header).encode('utf-8')
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(table[name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    """Return the JSON header of a profile without touching the pixel data"""
+    with open(path, 'rb') as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a wMouseClicker profile")
+        (length,) = struct.unpack('<I', f.read(4))
+        return json.loads(f.read(length).decode('utf-8'))
+
+
+def map_arrays(path, header, in_memory=False):
+    """Memory-map every array listed in `header`; pages load on first access
+
+    With `in_memory` the file is read into memory instead, so it is not held
+    open (Windows cannot replace a file that is still mapped).
+    """
+    with open(path, 'rb') as f:
+        if in_memory:
+            buffer = f.read()
+        else:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    arrays = {}
+    for name, info in header['arrays'].items():
+        dtype = np.dtype(info['dtype'])
+        count = int(np.prod(info['shape']))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                     offset=info['offset']).reshape(info['shape'])
+    return arrays
+
+
+def load_profile(path, in_memory=False):
+    """Load a profile; return (ClickJob, settings dict, {name: mapped array})"""
+    header = read_header(path)
+    arrays = map_arrays(path, header, in_memory)
+    engine = CompareEngine(arrays['reference'])
+    if 'ignore' in arrays:
+        engine.set_mask(arrays['ignore'].astype(bool))
+    job = ClickJob(
+        header.get('name') or os.path.splitext(os.path.basename(path))[0],
+        *header['click'],
+        region=header.get('region'),
+        rest_position=header.get('rest'),
+        interval=header.get('interval', 300),
+        interval_max=header.get('interval_max'),
+        click_type=header.get('click_type', 'left'),
+        threshold=header.get('threshold', 100),
+        safety=header.get('safety', True),
+        search_margin=header.get('search_margin', 0),
+        fidelity=header.get('fidelity', 'rgb'),
+        engine=engine,
+    )
+    return job, header.get('settings', {}), arrays
+
+
+def load_profiles(directory):
+    """Load every profile in `directory`, sorted by file name"""
+    profiles = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(EXTENSION):
+            profiles.append(load_profile(os.path.join(directory, name)))
+    return profiles
+
@@ -0,0 +1,187 @@
+"""
+Frame-sequence recordings for wMouseClicker.
+A FrameRecorder appends every tick's live region frame to a file, together
+with what the tick decided (similarity, click/skip, capture error). Frames
+are delta-compressed: each one is stored as the XOR with the same job's
+previous frame, cut to the band of rows that changed and zlib-compressed.
+An unchanged frame has no payload at all, so a static screen costs a few
+bytes per tick. Every KEYFRAME_INTERVAL frames a job gets a full key frame. The
+job's reference is written once, before its first frame, and again whenever
+it changes, so a recording can be replayed on its own (see replay.py). An
+ignore mask travels with its reference as a fourth channel (255 = ignored).
+
+File layout (.wmcr):
+    b'WMCR' | uint32 version | records...
+    record: struct RECORD (kind, time, height, width, channels, meta length,
+            payload length) | JSON meta | zlib payload
+    delta payload: uint16 first row, uint16 row count | zlib XOR of those rows
+"""
+
+import json
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b'WMCR'
+VERSION = 1
+EXTENSION = '.wmcr'
+RECORD = struct.Struct('<BdHHBII')
+BAND = struct.Struct('<HH')
+KEYFRAME_INTERVAL = 100  # Frames per job between full key frames
+LEVEL = 1  # zlib level: XOR deltas are mostly zeros, higher levels gain little
+
+# Record kinds
+REFERENCE, KEY, DELTA, TICK = range(4)  # TICK: a tick with no frame (capture failed)
+
+# One recorded tick; `frame` is None when the capture failed
+Frame = namedtuple('Frame', 'time job frame similarity decision error')
+# A job's reference as it was while the following frames were recorded
+Reference = namedtuple('Reference', 'job image ignore threshold fidelity region')
+
+
+class FrameRecorder:
+    """Appends ticks of one or more jobs to a recording file"""
+
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL, clock=time.time):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.clock = clock
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + struct.pack('<I', VERSION))
+        self._lock = threading.Lock()
+        self._previous = {}  # job name -> last recorded frame (a copy)
+        self._since_key = {}  # job name -> frames since the last key frame
+        self._references = {}  # job name -> (engine, ignore mask) last written
+        self.frames = 0
+        self.raw_bytes = 0  # Uncompressed size of the recorded frames
+        self.written_bytes = 0
+
+    def _write(self, kind, array, meta, payload=None):
+        meta_bytes = json.dumps(meta).encode('utf-8')
+        if payload is None:
+            payload = zlib.compress(array.tobytes(), LEVEL) if array is not None else b''
+        height, width, channels = (array.shape + (1,))[:3] if array is not None else (0, 0, 0)
+        self._file.write(RECORD.pack(kind, self.clock(), height, width, channels, len(meta_bytes), len(payload)))
+        self._file.write(meta_bytes)
+        self._file.write(payload)
+        self.written_bytes += RECORD.size + len(meta_bytes) + len(payload)
+
+    def _write_reference(self, job):
+        engine = job.engine
+        reference = engine.ref_array
+        if engine.ignore is not None:
+            reference = np.dstack([reference, engine.ignore.astype(np.uint8) * 255])
+        self._write(REFERENCE, np.ascontiguousarray(reference), {
+            'job': job.name, 'threshold': job.threshold, 'fidelity': engine.fidelity,
+            'region': list(job.region) if job.region is not None else None,
+        })
+        self._references[job.name] = (engine, engine.ignore)
+        self._previous.pop(job.name, None)  # Next frame is a key frame
+
+    def record(self, job, result=None, did_click=None):
+        """Append the tick `job` just ran (its last_frame and last_error)"""
+        if job.engine is None:
+            return
+        meta = {
+            'job': job.name,
+            'similarity': result.similarity if result is not None else None,
+            'decision': None if did_click is None else 'click' if did_click else 'skip',
+            'error': job.last_error,
+        }
+        with self._lock:
+            written = self._references.get(job.name)
+            if written is None or written[0] is not job.engine or written[1] is not job.engine.ignore:
+                self._write_reference(job)
+            if job.last_frame is None:
+                self._write(TICK, None, meta)
+                return
+            frame = np.ascontiguousarray(job.engine.as_array(job.last_frame))
+            previous = self._previous.get(job.name)
+            since_key = self._since_key.get(job.name, 0)
+            if previous is None or previous.shape != frame.shape or since_key >= self.keyframe_interval:
+                self._write(KEY, frame, meta)
+                self._since_key[job.name] = 1
+            else:
+                self._write(DELTA, frame, meta, delta_payload(frame, previous))
+                self._since_key[job.name] = since_key + 1
+            self._previous[job.name] = frame.copy()
+            self.frames += 1
+            self.raw_bytes += frame.nbytes
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def delta_payload(frame, previous):
+    """XOR of the rows that changed since `previous`; empty when nothing did"""
+    changed = np.flatnonzero((frame != previous).any(axis=tuple(range(1, frame.ndim))))
+    if not len(changed):
+        return b''
+    top, bottom = changed[0], changed[-1] + 1
+    band = np.bitwise_xor(frame[top:bottom], previous[top:bottom])
+    return BAND.pack(top, bottom - top) + zlib.compress(band.tobytes(), LEVEL)
+
+
+def apply_delta(payload, previous):
+    """Frame rebuilt from `previous` and a delta_payload"""
+    if not payload:
+        return previous
+    top, rows = BAND.unpack_from(payload)
+    frame = previous.copy()
+    band = np.frombuffer(zlib.decompress(payload[BAND.size:]), dtype=np.uint8)
+    frame[top:top + rows] ^= band.reshape((rows,) + previous.shape[1:])
+    return frame
+
+
+def read_recording(path):
+    """Yield the Reference and Frame records of a recording, in order"""
+    previous = {}
+    with open(path, 'rb') as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a wMouseClicker recording")
+        (version,) = struct.unpack('<I', f.read(4))
+        if version > VERSION:
+            raise ValueError(f"{path} was written by a newer version ({version})")
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return  # End of file, or a record cut short by a crash
+            kind, stamp, height, width, channels, meta_length, payload_length = RECORD.unpack(head)
+            meta = json.loads(f.read(meta_length).decode('utf-8'))
+            payload = f.read(payload_length)
+            if len(payload) < payload_length:
+                return
+            job = meta['job']
+            array = None
+            if kind in (REFERENCE, KEY):
+                shape = (height, width, channels) if channels > 1 else (height, width)
+                array = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(shape)
+            if kind == REFERENCE:
+                previous.pop(job, None)
+                ignore = array[:, :, 3] > 0 if channels == 4 else None
+                yield Reference(job, array[:, :, :3], ignore, meta.get('threshold'), meta.get('fidelity'),
+                                meta.get('region'))
+            elif kind in (KEY, DELTA):
+                if kind == DELTA:
+                    array = apply_delta(payload, previous[job])
+                previous[job] = array
+                yield Frame(stamp, job, array, meta.get('similarity'), meta.get('decision'), meta.get('error'))
+            else:
+                yield Frame(stamp, job, None, meta.get('similarity'), meta.get('decision'), meta.get('error'))
+
+
+def add_arguments(parser):
+    """Add the --record-frames option to an argparse parser"""
+    parser.add_argument('--record-frames', default=None,
+                        help="record every tick's region frame to this file (replay with replay.py)")
+
+
+def from_arguments(args):
+    """FrameRecorder for parsed add_arguments options, or None"""
+    return FrameRecorder(args.record_frames) if args.record_frames else None
@@ -0,0 +1,234 @@
+"""
+Offline replay of frame recordings for wMouseClicker.
+Runs the frames of a recording (see recording.py) through one or more
+comparators as fast as they go and sweeps the similarity threshold, so the
+threshold, fidelity and comparator can be tuned on real captures instead of
+in front of the screen. Every comparator is scored against the exact
+similarity (what compare_images computes) at the same threshold.
+
+Comparators:
+    similarity        exact full diff with the ignore mask (compare_images)
+    pil               PIL ImageChops diff, without the ignore mask
+    engine[:FIDELITY] the live path: fidelity levels + banded early exit
+    module:function   any function(reference, frame) -> similarity %, on RGB arrays
+
+Usage: python replay.py ticks.wmcr [--job NAME] [--thresholds 90,95,98,99,100]
+                        [--comparators similarity,engine,engine:gray/4] [--json results.json]
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from image_compare import CompareEngine, pil_similarity
+from recording import Reference, read_recording
+
+DEFAULT_THRESHOLDS = [90, 95, 98, 99, 100]
+DEFAULT_COMPARATORS = ['similarity', 'engine', 'engine:gray/4']
+
+
+class SimilarityComparator:
+    """Computes one similarity per frame; every threshold is decided from it"""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory  # reference -> (frame -> similarity %)
+        self._score = None
+
+    def reset(self, reference):
+        self._score = self._factory(reference)
+
+    def similarity(self, frame):
+        return self._score(frame)
+
+
+class EngineComparator:
+    """The live decision path, which depends on the threshold (early exit)"""
+
+    def __init__(self, name, fidelity='rgb'):
+        self.name = name
+        self.fidelity = fidelity
+        self.engine = None
+
+    def reset(self, reference):
+        self.engine = exact_engine(reference)
+        self.engine.set_fidelity(self.fidelity)
+
+    def decide(self, frame, threshold):
+        return self.engine.decide(frame, threshold).matched
+
+
+def exact_engine(reference):
+    engine = CompareEngine(reference.image)
+    if reference.ignore is not None:
+        engine.set_mask(reference.ignore)
+    return engine
+
+
+def pil_factory(reference):
+    image = Image.fromarray(reference.image)
+    return lambda frame: pil_similarity(image, Image.fromarray(frame))
+
+
+def get_comparator(spec):
+    """Comparator for a --comparators entry"""
+    if spec == 'similarity':
+        return SimilarityComparator(spec, lambda reference: exact_engine(reference).similarity)
+    if spec == 'pil':
+        return SimilarityComparator(spec, pil_factory)
+    if spec == 'engine' or spec.startswith('engine:'):
+        return EngineComparator(spec, spec.partition(':')[2] or 'rgb')
+    module_name, _, function_name = spec.partition(':')
+    if not function_name:
+        raise ValueError(f"Unknown comparator {spec!r} (expected similarity, pil, engine[:FIDELITY] "
+                         "or module:function)")
+    function = getattr(importlib.import_module(module_name), function_name)
+    return SimilarityComparator(spec, lambda reference: lambda frame: function(reference.image, frame))
+
+
+def frames(path, job=None):
+    """(Reference, frame array) for every recorded frame of `job` (or of every job)"""
+    references = {}
+    for record in read_recording(path):
+        if job is not None and record.job != job:
+            continue
+        if isinstance(record, Reference):
+            references[record.job] = record
+        elif record.frame is not None and record.job in references:
+            yield references[record.job], record.frame
+
+
+def summarize(path, job=None):
+    """Counts of frames, failed captures and recorded decisions, and the exact similarities"""
+    summary = {'frames': 0, 'errors': {}, 'decisions': {}, 'recorded': []}
+    engines = {}
+    for record in read_recording(path):
+        if job is not None and record.job != job:
+            continue
+        if isinstance(record, Reference):
+            engines[record.job] = (exact_engine(record), record.threshold)
+            continue
+        if record.decision is not None:
+            summary['decisions'][record.decision] = summary['decisions'].get(record.decision, 0) + 1
+        if record.error:
+            summary['errors'][record.error] = summary['errors'].get(record.error, 0) + 1
+        if record.frame is None or record.job not in engines:
+            continue
+        engine, threshold = engines[record.job]
+        summary['frames'] += 1
+        summary['recorded'].append((engine.similarity(record.frame), threshold, record.decision))
+    return summary
+
+
+def suggest_threshold(similarities):
+    """(low, high): the similarities either side of the widest gap between recorded ones, or None
+
+    When the frames fall into a "same UI" cluster and a "changed UI" cluster,
+    any threshold inside the gap separates them; its midpoint, the suggested
+    threshold, has the most room on both sides.
+    """
+    values = np.unique(np.asarray(similarities, dtype=np.float64))
+    if len(values) < 2:
+        return None
+    gaps = np.diff(values)
+    widest = int(np.argmax(gaps))
+    return float(values[widest]), float(values[widest + 1])
+
+
+def sweep(path, comparators, thresholds, truth, job=None):
+    """{comparator: {threshold: {'clicks', 'agree', 'us'}}} over every frame
+
+    `truth` is the exact similarity of each frame, in recording order.
+    """
+    results = {}
+    for comparator in comparators:
+        clicks = dict.fromkeys(thresholds, 0)
+        agree = dict.fromkeys(thresholds, 0)
+        seconds = dict.fromkeys(thresholds, 0.0)
+        reference = None
+        for index, (frame_reference, frame) in enumerate(frames(path, job)):
+            if frame_reference is not reference:
+                reference = frame_reference
+                comparator.reset(reference)
+            if isinstance(comparator, SimilarityComparator):
+                start = time.perf_counter()
+                similarity = comparator.similarity(frame)
+                elapsed = time.perf_counter() - start
+                decisions = {t: similarity >= t for t in thresholds}
+                for t in thresholds:
+                    seconds[t] += elapsed
+            else:
+                decisions = {}
+                for t in thresholds:
+                    start = time.perf_counter()
+                    decisions[t] = comparator.decide(frame, t)
+                    seconds[t] += time.perf_counter() - start
+            for t in thresholds:
+                clicks[t] += decisions[t]
+                agree[t] += decisions[t] == (truth[index] >= t)
+        count = max(1, len(truth))
+        results[comparator.name] = {
+            t: {'clicks': clicks[t] / count, 'agree': agree[t] / count, 'us': seconds[t] / count * 1e6}
+            for t in thresholds
+        }
+    return results
+
+
+def parse_list(text, convert=str):
+    return [convert(item) for item in text.split(',') if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a frame recording through comparators and thresholds")
+    parser.add_argument('recording', help="file written with --record-frames")
+    parser.add_argument('--job', default=None, help="only replay this job's frames")
+    parser.add_argument('--thresholds', type=lambda text: parse_list(text, float), default=DEFAULT_THRESHOLDS,
+                        help="comma-separated thresholds to sweep (default 90,95,98,99,100)")
+    parser.add_argument('--comparators', type=parse_list, default=DEFAULT_COMPARATORS,
+                        help="comma-separated comparators (default similarity,engine,engine:gray/4)")
+    parser.add_argument('--json', default=None, help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    comparators = [get_comparator(spec) for spec in args.comparators]
+    summary = summarize(args.recording, args.job)
+    truth = [similarity for similarity, _, _ in summary['recorded']]
+    print(f"{summary['frames']} frames | recorded decisions: "
+          + (", ".join(f"{k} {v}" for k, v in sorted(summary['decisions'].items())) or "none"))
+    for error, count in summary['errors'].items():
+        print(f"  capture error x{count}: {error}")
+    if not truth:
+        print("No frames to replay", file=sys.stderr)
+        return 1
+
+    percentiles = np.percentile(truth, [0, 5, 50, 95, 100])
+    print("similarity min/p5/median/p95/max: " + " / ".join(f"{p:.2f}" for p in percentiles))
+    # Replaying the recorded threshold must reproduce what the live run decided
+    replayed = [(s >= t) == (d == 'click') for s, t, d in summary['recorded'] if d is not None and t is not None]
+    if replayed:
+        print(f"exact replay matches the recorded decisions on {sum(replayed) / len(replayed):.1%} of ticks")
+    gap = suggest_threshold(truth)
+    if gap is not None:
+        low, high = gap
+        print(f"widest gap: {low:.2f}% .. {high:.2f}%, suggested threshold {(low + high) / 2:.2f}")
+
+    results = sweep(args.recording, comparators, args.thresholds, truth, args.job)
+    print(f"\n{'comparator':>16} {'threshold':>9} {'clicks':>7} {'agree':>7} {'us/decision':>12}")
+    for name, by_threshold in results.items():
+        for threshold, row in by_threshold.items():
+            print(f"{name:>16} {threshold:>9g} {row['clicks']:7.1%} {row['agree']:7.1%} {row['us']:12.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'frames': summary['frames'], 'decisions': summary['decisions'], 'errors': summary['errors'],
+                       'suggested': gap, 'results': {name: {str(t): row for t, row in rows.items()}
+                                                     for name, rows in results.items()}}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
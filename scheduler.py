@@ -0,0 +1,494 @@
+"""
+Multi-target click scheduler for wMouseClicker.
+Each ClickJob holds one target (click point, monitored region, reference,
+rest position, interval range, click type). A single Scheduler thread drives
+all jobs from a priority queue keyed by next-due time. check_tick and
+finish_tick are the one tick sequence (capture, record, click, metrics,
+policy) that the Scheduler, AsyncEngine and Watcher all run.
+"""
+
+import functools
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+
+from image_compare import CompareEngine
+from metrics import NULL_METRICS
+
+
+class ClickJob:
+    """One click target with its own region, reference and interval"""
+
+    def __init__(self, name, x, y, region=None, reference=None, rest_position=None,
+                 interval=300, interval_max=None, click_type="left", threshold=100, safety=True,
+                 engine=None, search_margin=0, fidelity=None, macro=None, policy=None):
+        self.name = name
+        self.x = x
+        self.y = y
+        self.region = tuple(region) if region is not None else None  # (left, top, width, height)
+        self.reference = reference  # PIL Image of the monitored region
+        if engine is None and reference is not None:
+            engine = CompareEngine(reference)
+        if engine is not None and fidelity is not None:
+            engine.set_fidelity(fidelity)  # 'rgb', 'gray' or 'gray/N', see image_compare
+        self.engine = engine
+        self.rest_position = tuple(rest_position) if rest_position is not None else None
+        self.interval = interval  # Seconds
+        self.interval_max = interval_max  # Seconds, enables a random interval when greater
+        self.click_type = click_type
+        self.threshold = threshold
+        self.safety = safety
+        # Pixels around the region to search when the target may have moved (0 = off)
+        self.search_margin = search_margin
+        # macro.Macro played instead of the single click + rest click
+        self.macro = macro
+        # backoff.BackoffPolicy that picks intervals from click outcomes instead
+        self.policy = policy
+        self._matcher = None
+
+        # Runtime state
+        self.active = True
+        self.next_due = None
+        self.click_count = 0
+        self.skipped_count = 0
+        self.last_result = None
+        self.capture_time = None  # Seconds spent in the last capture (None if shared/skipped)
+        self.compare_time = None  # Seconds spent in the last compare
+        self.last_frame = None  # Region frame the last check compared (a reused buffer)
+        self.last_error = None  # Why the last tick's check failed, if it did
+        self.awaiting_outcome = False  # Clicked; the policy looks at the result when next due
+        self.offset = (0, 0)  # How far search mode has moved the target since the job was built
+
+    def next_interval(self, rng=random):
+        """Get the next interval (from the policy, random if a larger max is set, otherwise fixed)"""
+        if self.policy is not None:
+            return self.policy.next_interval(rng)
+        if self.interval_max is not None and self.interval_max > self.interval:
+            return rng.randint(self.interval, self.interval_max)
+        return self.interval
+
+    def needs_capture(self):
+        """True if ticks of this job compare its region against the reference"""
+        return self.safety and self.engine is not None and self.region is not None
+
+    def check(self, backend, frame=None):
+        """Decide whether the monitored region still matches the reference
+
+        `frame` is an already captured view of the region (from a batched grab);
+        without it the region is captured into the engine's buffer.
+        """
+        self.capture_time = self.compare_time = None
+        self.last_frame = None
+        if not self.needs_capture():
+            return None
+        if frame is None and self.search_margin > 0:
+            return self.search(backend)
+        if frame is None:
+            start = time.perf_counter()
+            frame = backend.grab_into(self.region, self.engine.live)
+            self.capture_time = time.perf_counter() - start
+        self.last_frame = frame
+        start = time.perf_counter()
+        result = self.engine.decide(frame, self.threshold)
+        self.compare_time = time.perf_counter() - start
+        return result
+
+    def search(self, backend):
+        """Find the reference within search_margin of the region and follow it
+
+        When the best match elsewhere passes the threshold, the region and the
+        click point shift by the same offset.
+        """
+        from template_match import TemplateMatcher
+
+        if self._matcher is None:
+            self._matcher = TemplateMatcher(self.engine.ref_array)
+        left, top, width, height = self.region
+        margin = self.search_margin
+        win_left, win_top = max(0, left - margin), max(0, top - margin)
+        start = time.perf_counter()
+        window = backend.grab_array((win_left, win_top,
+                                     left - win_left + width + margin, top - win_top + height + margin))
+        self.capture_time = time.perf_counter() - start
+        start = time.perf_counter()
+        match = self._matcher.locate(window)
+        view = window[match.y:match.y + height, match.x:match.x + width]
+        self.last_frame = view
+        result = self.engine.decide(view, self.threshold)
+        self.compare_time = time.perf_counter() - start
+
+        dx, dy = win_left + match.x - left, win_top + match.y - top
+        if result.matched and (dx or dy):
+            self.region = (left + dx, top + dy, width, height)
+            self.x += dx
+            self.y += dy
+            self.offset = (self.offset[0] + dx, self.offset[1] + dy)
+        return result
+
+
+def bounding_box(regions):
+    """Smallest (left, top, width, height) covering all `regions`"""
+    left = min(r[0] for r in regions)
+    top = min(r[1] for r in regions)
+    right = max(r[0] + r[2] for r in regions)
+    bottom = max(r[1] + r[3] for r in regions)
+    return (left, top, right - left, bottom - top)
+
+
+_pyautogui = None
+
+
+def load_pyautogui():
+    """Import pyautogui on first use and apply the app's global settings"""
+    global _pyautogui
+    if _pyautogui is None:
+        import pyautogui
+        pyautogui.FAILSAFE = True  # Move mouse to corner to abort
+        pyautogui.PAUSE = 0  # Step timing comes from macro.MacroPlayer, not a pause per call
+        _pyautogui = pyautogui
+    return _pyautogui
+
+
+def click_job(job, backend=None):
+    """Play the job's macro, or its click followed by a click at its rest position
+
+    The rest click keeps the cursor from affecting the next UI screenshot.
+    Guarded macro steps capture through `backend`, the job's own capture
+    backend, and the macro moves with the target when search mode followed it.
+    """
+    from macro import click_macro, default_player
+
+    macro = job.macro.shifted(*job.offset) if job.macro is not None else click_macro(job)
+    return default_player().play(macro, capture_backend=backend)
+
+
+def check_tick(job, backend, frame=None, future=None, recorder=None, blind=True):
+    """First half of a tick: check the job's region; return (result, should_click, error)
+
+    `frame` is a batched view of the region and `future` a pending ComparePool
+    result, see Scheduler.run_pending. A job that was not checked (safety off)
+    or whose capture or compare failed clicks anyway if `blind` (interval
+    loops), never otherwise (watch mode). The frame is recorded before
+    anything is clicked.
+    """
+    result = None
+    error = False
+    job.last_error = None
+    try:
+        if future is not None:
+            result, job.compare_time = future.result()
+        else:
+            result = job.check(backend, frame)
+        should_click = result.matched if result is not None else blind
+    except Exception as exc:
+        error = True
+        should_click = blind
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.last_frame = None
+    if recorder is not None:
+        recorder.record(job, result, should_click)
+    return result, should_click, error
+
+
+def finish_tick(job, result, did_click, click_time=None, lateness=None, error=False, metrics=NULL_METRICS):
+    """Second half of a tick: counters, metrics and the job's policy after the click (if any)"""
+    if did_click:
+        job.click_count += 1
+    else:
+        job.skipped_count += 1
+    if metrics.enabled:
+        metrics.record_tick(job.name, job.capture_time, job.compare_time, click_time, lateness,
+                            result.similarity if result is not None else None,
+                            'click' if did_click else 'skip', error)
+    job.last_result = result
+    if job.policy is not None:
+        # Clicked: the policy looks at the result once the screen has settled
+        job.awaiting_outcome = job.policy.after_tick(did_click)
+
+
+def run_tick(job, backend, clicker=None, frame=None, lateness=None, future=None, recorder=None,
+             metrics=NULL_METRICS):
+    """One whole tick on the calling thread: check, click if still matching, finish; return (result, clicked)
+
+    `clicker(job)` defaults to click_job on `backend`.
+    """
+    result, should_click, error = check_tick(job, backend, frame, future, recorder)
+    click_time = None
+    if should_click:
+        start = time.perf_counter()
+        if clicker is not None:
+            clicker(job)
+        else:
+            click_job(job, backend)
+        click_time = time.perf_counter() - start
+    finish_tick(job, result, should_click, click_time, lateness, error, metrics)
+    return result, should_click
+
+
+class FakeClock:
+    """Manually advanced monotonic clock for driving a Scheduler in tests"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def wait(self, event, timeout):
+        """Stand-in for threading.Event.wait: jump ahead instead of blocking"""
+        if event.is_set():
+            return True
+        self.advance(timeout)
+        return event.is_set()
+
+
+class DeadlineTimer:
+    """Waits for absolute monotonic deadlines on an Event, so stop() is immediate"""
+
+    def __init__(self, clock=time.monotonic, wait=threading.Event.wait):
+        self.clock = clock
+        self._wait = wait  # Called as wait(event, timeout), returns True once stopped
+        self._stop = threading.Event()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def stop(self):
+        """Wake any waiter right away"""
+        self._stop.set()
+
+    def reset(self):
+        """Re-arm after stop()"""
+        self._stop.clear()
+
+    def wait_until(self, deadline, on_tick=None, tick=1.0):
+        """Block until `deadline`; return False if stopped first
+
+        on_tick(remaining) is called once per whole `tick` of remaining time,
+        aligned to the deadline, so a countdown display never drifts.
+        """
+        shown = None
+        while True:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return not self.stopped
+            steps = math.ceil(remaining / tick)
+            if on_tick is not None and steps != shown:
+                shown = steps
+                on_tick(steps * tick)
+            # Sleep to the next boundary, not a fixed tick, to stay on the absolute schedule
+            if self._wait(self._stop, remaining - (steps - 1) * tick):
+                return False
+
+    def sleep(self, seconds):
+        """Relative wait; return False if stopped first"""
+        return self.wait_until(self.clock() + seconds)
+
+
+class Scheduler:
+    """Runs many ClickJobs from one timer thread, ordered by next-due time"""
+
+    def __init__(self, backend, clicker=None, clock=time.monotonic, rng=None, on_tick=None,
+                 batch_capture=True, batch_window=0.0, metrics=NULL_METRICS, pool=None, on_outcome=None,
+                 recorder=None):
+        self.backend = backend
+        self.metrics = metrics
+        self.recorder = recorder  # Optional recording.FrameRecorder, sees every tick's frame
+        # Optional ComparePool: when several jobs are due together their compares
+        # run in worker processes instead of one after another on this thread
+        self.pool = pool
+        # Jobs due together share one bounding-box grab; jobs due within
+        # batch_window seconds of each other are pulled forward to join it
+        self.batch_capture = batch_capture
+        self.batch_window = batch_window
+        self.capture_calls = 0
+        # Called as clicker(job); None plays click_job on `backend`
+        self.clicker = clicker or functools.partial(click_job, backend=backend)
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.on_tick = on_tick  # Called as on_tick(job, result, did_click) after every tick
+        self.on_outcome = on_outcome  # Called as on_outcome(job, outcome) after a policy's check
+        self.jobs = []
+        self._queue = []  # Heap of (next_due, seq, job)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.running = False
+
+    def add_job(self, job, delay=0):
+        """Schedule `job`, first due `delay` seconds from now"""
+        if job.interval <= 0:
+            raise ValueError("Job interval must be greater than 0")
+        with self._lock:
+            job.active = True
+            job.next_due = self.clock() + delay
+            self.jobs.append(job)
+            heapq.heappush(self._queue, (job.next_due, next(self._seq), job))
+        self._wake.set()
+        return job
+
+    def remove_job(self, job):
+        """Stop scheduling `job` (its queue entry is dropped lazily)"""
+        with self._lock:
+            job.active = False
+            if job in self.jobs:
+                self.jobs.remove(job)
+        if self.pool is not None:
+            self.pool.release(job)
+        self._wake.set()
+
+    def next_due(self):
+        """Deadline of the earliest active job, or None when idle"""
+        with self._lock:
+            while self._queue and not self._queue[0][2].active:
+                heapq.heappop(self._queue)
+            return self._queue[0][0] if self._queue else None
+
+    def _pop_due(self, now):
+        """Pop the earliest active job due at or before `now`"""
+        with self._lock:
+            while self._queue:
+                due, _, job = self._queue[0]
+                if not job.active:
+                    heapq.heappop(self._queue)
+                    continue
+                if due > now:
+                    return None
+                heapq.heappop(self._queue)
+                return job
+        return None
+
+    def _reschedule(self, job, now):
+        """Queue `job` again relative to its absolute deadline, not to `now`"""
+        with self._lock:
+            if not job.active:
+                return
+            if job.awaiting_outcome:
+                # Not an attempt: look at the click's result once the screen has settled
+                job.next_due = now + job.policy.detector.settle
+                heapq.heappush(self._queue, (job.next_due, next(self._seq), job))
+                return
+            job.next_due += job.next_interval(self.rng)
+            # Fell more than a whole interval behind: restart from now instead of bursting
+            if job.next_due <= now:
+                job.next_due = now + job.next_interval(self.rng)
+            heapq.heappush(self._queue, (job.next_due, next(self._seq), job))
+
+    def capture_batch(self, jobs):
+        """Grab one frame covering all monitored `jobs`; return {job: region view}"""
+        monitored = [job for job in jobs
+                     if job.needs_capture() and not job.search_margin and not job.awaiting_outcome]
+        if len(monitored) < 2:
+            return {}
+        left, top, width, height = bounding_box([job.region for job in monitored])
+        start = time.perf_counter()
+        try:
+            frame = self.backend.grab_array((left, top, width, height))
+        except Exception:
+            return {}  # Each job falls back to its own capture
+        self.capture_calls += 1
+        if self.metrics.enabled:
+            self.metrics.observe('capture_seconds', time.perf_counter() - start)
+        views = {}
+        for job in monitored:
+            x, y, w, h = job.region
+            views[job] = frame[y - top:y - top + h, x - left:x - left + w]
+        return views
+
+    def run_job(self, job, frame=None, lateness=None, future=None):
+        """Check one job's region and click if it still matches
+
+        `future` is a pending ComparePool result for this tick, used instead of
+        comparing here.
+        """
+        if job.awaiting_outcome:
+            return self.run_outcome(job)
+        if frame is None and job.needs_capture():
+            self.capture_calls += 1
+        result, did_click = run_tick(job, self.backend, self.clicker, frame, lateness, future,
+                                     self.recorder, self.metrics)
+        if job.policy is not None and job.policy.stopped:
+            self.remove_job(job)
+        if self.on_tick is not None:
+            self.on_tick(job, result, did_click)
+        return did_click
+
+    def run_outcome(self, job):
+        """Let the job's policy classify the screen after its last click"""
+        job.awaiting_outcome = False
+        outcome = job.policy.detect(self.backend, job.offset)
+        if job.policy.stopped:
+            self.remove_job(job)  # Success, or out of attempts
+        if self.on_outcome is not None:
+            self.on_outcome(job, outcome)
+        return False
+
+    def run_pending(self, now=None):
+        """Run every job due at `now` (defaults to the clock); return how many ran"""
+        if now is None:
+            now = self.clock()
+        due = []
+        horizon = now + self.batch_window if self.batch_capture else now
+        while True:
+            job = self._pop_due(horizon)
+            if job is None:
+                break
+            due.append(job)
+
+        frames = self.capture_batch(due) if self.batch_capture else {}
+        futures = {}
+        if self.pool is not None and len(due) > 1:
+            # Start every compare first, then click in due order as results arrive
+            for job in due:
+                if not job.awaiting_outcome:
+                    futures[job] = self.pool.submit(job, self.backend, frames.get(job))
+        for job in due:
+            lateness = max(0.0, self.clock() - job.next_due)
+            self.run_job(job, frames.get(job), lateness, futures.get(job))
+            self._reschedule(job, now)
+        return len(due)
+
+    def run(self):
+        """Timer loop: sleep until the next deadline, run due jobs, repeat"""
+        while self.running:
+            self._wake.clear()
+            self.run_pending()
+            due = self.next_due()
+            timeout = None if due is None else max(0.0, due - self.clock())
+            self._wake.wait(timeout)
+
+    def run_forever(self):
+        """Run the timer loop on the calling thread until stop()"""
+        self.running = True
+        try:
+            self.run()
+        finally:
+            self.running = False
+
+    def start(self):
+        """Start the timer thread"""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """Stop the timer thread
+
+        With wait=False this returns at once; a tick in progress (a long macro,
+        say) still finishes on the timer thread, which then exits.
+        """
+        self.running = False
+        self._wake.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
@@ -0,0 +1,92 @@
+"""
+Template matching for wMouseClicker.
+Finds the captured reference inside a larger search window with a
+coarse-to-fine grayscale pyramid: an exhaustive sum-of-absolute-differences
+search at the coarsest level, then a small neighbourhood refinement at each
+finer level. Fast enough to run every tick, unlike a brute-force search.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Position of the best match inside the search window, and its similarity (0-100)
+Match = namedtuple('Match', 'x y similarity')
+
+MIN_TEMPLATE_SIDE = 8  # Coarsest level keeps at least this many pixels per side
+MAX_LEVELS = 5
+REFINE_RADIUS = 2  # Pixels searched around the upscaled coarse position
+
+
+def to_gray(array):
+    """RGB uint8 array -> float32 luma"""
+    return array[..., 0] * np.float32(0.299) + array[..., 1] * np.float32(0.587) \
+        + array[..., 2] * np.float32(0.114)
+
+
+def downsample(gray):
+    """Halve both dimensions with a 2x2 box filter"""
+    h, w = gray.shape[0] // 2 * 2, gray.shape[1] // 2 * 2
+    return (gray[0:h:2, 0:w:2] + gray[1:h:2, 0:w:2] + gray[0:h:2, 1:w:2] + gray[1:h:2, 1:w:2]) * 0.25
+
+
+def build_pyramid(gray, levels):
+    """List of `levels` images, full resolution first"""
+    pyramid = [gray]
+    for _ in range(levels - 1):
+        pyramid.append(downsample(pyramid[-1]))
+    return pyramid
+
+
+def exhaustive_sad(window, template):
+    """SAD of `template` at every position of `window`, shape (ny, nx)"""
+    th, tw = template.shape
+    views = sliding_window_view(window, (th, tw))
+    scores = np.empty(views.shape[:2], dtype=np.float64)
+    # One row of positions at a time keeps the temporary small
+    for y in range(views.shape[0]):
+        scores[y] = np.abs(views[y] - template).sum(axis=(1, 2))
+    return scores
+
+
+class TemplateMatcher:
+    """Locates a reference image inside search windows of any size"""
+
+    def __init__(self, reference_array, max_levels=MAX_LEVELS):
+        gray = to_gray(reference_array)
+        side = min(gray.shape)
+        levels = 1
+        while levels < max_levels and side >> levels >= MIN_TEMPLATE_SIDE:
+            levels += 1
+        self.levels = levels
+        self.shape = gray.shape
+        self.pyramid = build_pyramid(gray, levels)
+
+    def locate(self, window_array):
+        """Return the Match of the reference inside the RGB `window_array`"""
+        window = to_gray(window_array)
+        th, tw = self.shape
+        if window.shape[0] < th or window.shape[1] < tw:
+            raise ValueError("Search window is smaller than the reference")
+        windows = build_pyramid(window, self.levels)
+
+        # Coarsest level: exhaustive search
+        level = self.levels - 1
+        scores = exhaustive_sad(windows[level], self.pyramid[level])
+        y, x = np.unravel_index(np.argmin(scores), scores.shape)
+
+        # Finer levels: refine around the upscaled position
+        for level in range(self.levels - 2, -1, -1):
+            win, tpl = windows[level], self.pyramid[level]
+            max_y = win.shape[0] - tpl.shape[0]
+            max_x = win.shape[1] - tpl.shape[1]
+            y0, y1 = max(0, 2 * y - REFINE_RADIUS), min(max_y, 2 * y + REFINE_RADIUS)
+            x0, x1 = max(0, 2 * x - REFINE_RADIUS), min(max_x, 2 * x + REFINE_RADIUS)
+            region = win[y0:y1 + tpl.shape[0], x0:x1 + tpl.shape[1]]
+            scores = exhaustive_sad(region, tpl)
+            dy, dx = np.unravel_index(np.argmin(scores), scores.shape)
+            y, x = y0 + dy, x0 + dx
+
+        mean_diff = np.abs(windows[0][y:y + th, x:x + tw] - self.pyramid[0]).mean()
+        return Match(int(x), int(y), max(0.0, 100 - float(mean_diff) / 255 * 100))
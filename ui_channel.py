@@ -0,0 +1,34 @@
+"""
+Worker -> Tk update channel for wMouseClicker.
+Worker threads overwrite named fields of one shared snapshot; the Tk thread
+takes whatever changed at a fixed refresh rate and repaints once. However
+many ticks, countdown updates or jobs post in between, Tk sees one callback
+per refresh and only the latest value of each field.
+"""
+
+import threading
+
+
+class UIChannel:
+    """Thread-safe latest-value mailbox, drained by the Tk thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.posts = 0  # Updates posted by workers
+        self.deliveries = 0  # Non-empty take() calls, i.e. repaints
+
+    def post(self, **fields):
+        """Overwrite fields of the snapshot (any thread, never blocks on Tk)"""
+        with self._lock:
+            self._pending.update(fields)
+            self.posts += 1
+
+    def take(self):
+        """Return {field: latest value} changed since the last take, or None"""
+        with self._lock:
+            if not self._pending:
+                return None
+            pending, self._pending = self._pending, {}
+        self.deliveries += 1
+        return pending
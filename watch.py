@@ -0,0 +1,134 @@
+"""
+Change-detection watch mode for wMouseClicker.
+Instead of sampling once per interval, a Watcher polls the monitored region
+at a high rate with the incremental compare and clicks as soon as it
+matches the captured reference, keeping a minimum gap between clicks.
+"""
+
+import collections
+import functools
+import threading
+import time
+
+from metrics import NULL_METRICS
+from scheduler import DeadlineTimer, check_tick, click_job, finish_tick
+
+DEFAULT_RATE = 20.0  # Polls per second
+DEFAULT_MIN_GAP = 5.0  # Seconds between clicks
+
+
+class Watcher:
+    """Polls one ClickJob's region and clicks the moment it matches"""
+
+    def __init__(self, job, backend, clicker=None, rate=DEFAULT_RATE, min_gap=DEFAULT_MIN_GAP,
+                 edge=False, timer=None, on_poll=None, metrics=NULL_METRICS, incremental=True, recorder=None):
+        if rate <= 0:
+            raise ValueError("Watch rate must be greater than 0")
+        if job.policy is not None:
+            raise ValueError("Watch mode clicks on a match, not on an interval: it takes no backoff policy")
+        self.job = job
+        self.backend = backend
+        self.clicker = clicker or functools.partial(click_job, backend=backend)
+        self.period = 1.0 / rate
+        self.min_gap = min_gap
+        self.edge = edge  # Only click on a mismatch -> match transition
+        self.timer = timer or DeadlineTimer()
+        self.on_poll = on_poll  # Called as on_poll(watcher, result, did_click)
+        self.metrics = metrics
+        self.recorder = recorder  # Optional recording.FrameRecorder, sees every poll's frame
+        self._thread = None
+        self._restore_incremental = None  # Engine to switch back to full compares on stop()
+        # Consecutive polls mostly see the same frame: only re-diff what changed
+        self.incremental = incremental and job.engine is not None
+
+        # Stats
+        self.polls = 0
+        self.matches = 0
+        self.last_click = None
+        self.last_mismatch = None
+        self.was_matching = False
+        self.latencies = collections.deque(maxlen=1000)  # Seconds, see poll()
+        self.busy_time = 0.0  # Time spent capturing/comparing/clicking
+
+    def poll(self, now=None):
+        """Capture and compare once; click if the region matches. Return True if clicked"""
+        clock = self.timer.clock
+        if now is None:
+            now = clock()
+        self.polls += 1
+        # A failed capture counts as "not matching": watch mode never clicks blind
+        result, matched, error = check_tick(self.job, self.backend, recorder=self.recorder, blind=False)
+
+        did_click = False
+        click_time = None
+        if matched:
+            self.matches += 1
+            gap_ok = self.last_click is None or now - self.last_click >= self.min_gap
+            if gap_ok and not (self.edge and self.was_matching):
+                start = time.perf_counter()
+                self.clicker(self.job)
+                click_time = time.perf_counter() - start
+                done = clock()
+                self.last_click = now
+                did_click = True
+                # The UI changed at some point after the last mismatching poll,
+                # so this is an upper bound on the reaction latency
+                since = self.last_mismatch if self.last_mismatch is not None else now
+                self.latencies.append(done - since)
+        else:
+            self.last_mismatch = now
+        self.was_matching = matched
+        finish_tick(self.job, result, did_click, click_time, None, error, self.metrics)
+        self.busy_time += clock() - now
+
+        if self.on_poll is not None:
+            self.on_poll(self, result, did_click)
+        return did_click
+
+    def run(self):
+        """Poll on absolute deadlines until the timer is stopped"""
+        deadline = self.timer.clock()
+        while not self.timer.stopped:
+            self.poll()
+            deadline += self.period
+            now = self.timer.clock()
+            if deadline <= now:
+                deadline = now + self.period  # Skip missed polls instead of bursting
+            if not self.timer.wait_until(deadline):
+                break
+
+    def start(self):
+        """Start polling on a daemon thread"""
+        self.timer.reset()
+        self._restore_incremental = None
+        if self.incremental and not self.job.engine.incremental:
+            self._restore_incremental = self.job.engine
+            self.job.engine.set_incremental(True)
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling immediately"""
+        self.timer.stop()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        if self._restore_incremental is not None:
+            # The engine may be shared with an interval loop that uses fidelity levels
+            self._restore_incremental.set_incremental(False)
+            self._restore_incremental = None
+
+    def report(self):
+        """Summary of polls, clicks, reaction latency and duty cycle"""
+        latencies = sorted(self.latencies)
+        report = {
+            'polls': self.polls,
+            'matches': self.matches,
+            'clicks': self.job.click_count,
+            'mean_busy_ms': self.busy_time / self.polls * 1000 if self.polls else 0.0,
+        }
+        if latencies:
+            report['latency_mean_ms'] = sum(latencies) / len(latencies) * 1000
+            report['latency_p95_ms'] = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+            report['latency_max_ms'] = latencies[-1] * 1000
+        return report